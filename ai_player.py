@@ -1,8 +1,7 @@
-from random import random
-
-import pygame
+import argparse
 
 from alien_invasion import AlienInvasion
+from game_loop import GameLoop
 
 
 class AIPlayer:
@@ -10,31 +9,39 @@ class AIPlayer:
 
     def __init__(self, ai_game):
         self.ai_game = ai_game
+        self.ai_game.player = "bot"
+
+        # Get the full fleet size.
+        self.fleet_size = len(self.ai_game.aliens)
+
+        # Aim a little off the center of the target, differently per target.
+        # A new fleet reuses the indices of the last one, so remember the
+        # positions of the target's fleet too.
+        self.target = None
+        self.target_fleet = None
+        self.aim_offset = 0
 
-    def run_game(self):
-        # Run the bot.
+    def run_game(self, max_frames=None):
+        """Run the bot.
+
+        Stop after max_frames simulation steps if given. In headless mode the
+        bot plays as fast as possible and stops when the game is over.
+        """
         self.ai_game.stats.game_active = True
 
         # Hide the mouse cursor.
-        pygame.mouse.set_visible(False)
+        self.ai_game._set_mouse_visible(False)
 
         # Speed up the game for development work.
         self._modify_speed(1)
 
-        # Get the full fleet size.
-        self.fleet_size = len(self.ai_game.aliens)
-
         # Start the main loop for the game.
-        while True:
-            self.ai_game._check_events()
-            self._implement_strategy()
+        GameLoop(self.ai_game, self._step).run(max_frames)
 
-            if self.ai_game.stats.game_active:
-                self.ai_game.ship.update()
-                self.ai_game._update_bullets()
-                self.ai_game._update_aliens()
-
-            self.ai_game._update_screen()
+    def _step(self):
+        # Decide on the next move and advance the game by one step.
+        self._implement_strategy()
+        self.ai_game._update_game()
 
     def _implement_strategy(self):
         # Start chasing aliens if there are no more than a half of them.
@@ -43,31 +50,61 @@ class AIPlayer:
         else:
             self._sweep_right_left()
 
-        # Fire bullets at the given frequency, whenever possible.
-        self._fire_bullet(0.01)
+        # Fire whenever a bullet is likely to hit.
+        if self._will_hit():
+            self.ai_game._fire_bullet()
 
     def _get_target_alien(self):
-        # Find an alien to chase.
-        target_alien = self.ai_game.aliens.sprites()[0]
-
-        for alien in self.ai_game.aliens.sprites():
-            if alien.rect.y > target_alien.rect.y:
-                target_alien = alien
-            elif alien.rect.y < target_alien.rect.y:
-                continue
-            elif alien.rect.x > target_alien.rect.x:
-                target_alien = alien
-
-        return target_alien
+        # Find an alien to chase: the lowest one, the rightmost on ties.
+        aliens = self.ai_game.aliens
+        target = aliens.get_lowest_alien()
+
+        if target != self.target or aliens.x is not self.target_fleet:
+            self.target = target
+            self.target_fleet = aliens.x
+            self.aim_offset = self.ai_game.rng.uniform(-0.4, 0.4) * aliens.width
+
+        return aliens.get_rect(target)
+
+    def _get_bullet_steps(self, y):
+        # Return the steps a bullet fired now needs to reach the given y.
+        settings = self.ai_game.settings
+        distance = self.ai_game.ship.rect.top - y
+        return max(distance, 0) / settings.bullet_speed_factor
+
+    def _get_fleet_velocity(self):
+        # Return how far the fleet moves sideways per step.
+        settings = self.ai_game.settings
+        return settings.alien_speed_factor * settings.fleet_direction
+
+    def _will_hit(self):
+        # Predict if a bullet fired now hits an alien, if the fleet keeps moving.
+        aliens = self.ai_game.aliens
+        if not len(aliens):
+            return False
+
+        bullet_x = self.ai_game.ship.rect.centerx
+        velocity = self._get_fleet_velocity()
+
+        # Find the column over the bullet when it reaches the bottom of the fleet.
+        steps = self._get_bullet_steps(aliens.get_bounds().bottom)
+        column = aliens.find_column(bullet_x - velocity * steps)
+        if column < 0:
+            return False
+
+        # Check it again for the time it takes to reach that column.
+        target = aliens.get_column_lowest(column)
+        steps = self._get_bullet_steps(aliens.y[target] + aliens.height)
+        return aliens.find_column(bullet_x - velocity * steps) == column
 
     def _sweep_right_left(self):
         # Move the ship.
         ship = self.ai_game.ship
-        screen_rect = self.ai_game.screen.get_rect()
+        playfield = self.ai_game.playfield
 
         if not ship.moving_right and not ship.moving_left:
             ship.moving_right = True
-        elif ship.moving_right and ship.rect.right + 10 > screen_rect.right:
+        elif ship.moving_right and ship.rect.right + 10 > playfield.right:
             ship.moving_right = False
             ship.moving_left = True
         elif ship.moving_left and ship.rect.left < 10:
@@ -80,28 +117,67 @@ class AIPlayer:
         self.ai_game.settings.bullet_speed_factor *= speed_factor
         self.ai_game.settings.alien_speed_factor *= speed_factor
 
-    def _fire_bullet(self, firing_frequency):
-        # Fire a bullet with given frequency.
-        random_num = random()
-        if random_num <= firing_frequency:
-            self.ai_game._fire_bullet()
-
     def chase_alien(self):
         # Get specific alien to chase.
-        target_alien = self._get_target_alien()
+        target_rect = self._get_target_alien()
         ship = self.ai_game.ship
 
-        # Move toward target alien.
-        if ship.rect.x < target_alien.rect.x:
-            self.ai_game.ship.moving_right = True
-            self.ai_game.ship.moving_left = False
-        elif ship.rect.x > target_alien.rect.x:
-            self.ai_game.ship.moving_right = False
-            self.ai_game.ship.moving_left = True
+        # Aim where the target will be when a bullet fired now reaches it.
+        steps = self._get_bullet_steps(target_rect.bottom)
+        aim_x = (
+            target_rect.centerx + self._get_fleet_velocity() * steps + self.aim_offset
+        )
+
+        # Move toward the aim point, and stop once under it.
+        distance = aim_x - ship.rect.centerx
+        ship.moving_right = distance > self.ai_game.settings.ship_speed_factor
+        ship.moving_left = distance < -self.ai_game.settings.ship_speed_factor
 
 
 if __name__ == "__main__":
-    ai_game = AlienInvasion()
+    parser = argparse.ArgumentParser(description="Let a bot play Alien Invasion.")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a window or sound, as fast as possible",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=None, help="stop after this many frames"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="show frame times and save them to a file on exit",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--record", help="record the input of the game to this file")
+    parser.add_argument("--settings", help="load settings from this profile file")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print how long every phase of startup took",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="ADDRESS",
+        help="serve Prometheus metrics on this port, host:port or Unix socket",
+    )
+    args = parser.parse_args()
+
+    ai_game = AlienInvasion(
+        headless=args.headless,
+        profile=args.profile,
+        seed=args.seed,
+        record_file=args.record,
+        settings_file=args.settings,
+        metrics_address=args.metrics,
+    )
+    if args.startup_report:
+        print(ai_game.get_startup_report())
 
     ai_player = AIPlayer(ai_game)
-    ai_player.run_game()
+    ai_player.run_game(max_frames=args.frames)
+
+    if args.headless:
+        stats = ai_game.stats
+        print(f"Score: {stats.score}, level: {stats.level}, frames: {ai_game.frames}")
@@ -1,51 +1,137 @@
 """Alien Invasion game."""
+import argparse
+import os
+import random
 import sys
-import json
-from time import sleep
+from time import monotonic, perf_counter
 
+# When the imports below started, to time them for the startup report.
+_import_start = perf_counter()
+
+import numpy as np
 import pygame
-from pygame.sprite import Group
 
-from alien import Alien
-from bullet import Bullet
+from bullet import BulletPool
 from button import Button
+from fleet import Fleet
+from game_loop import GameLoop
+from game_history import GameHistory
 from game_stats import GameStats
+import input_log
+from input_log import InputRecorder
+import profiler
+from profiler import FrameProfiler
+from render import DrawList, QualityController
 from scoreboard import Scoreboard
 from settings import Settings
 from ship import Ship
 
-from consts import game_stats_file
+from consts import game_history_file
 import sound_effects as se
 
+# How long the imports took, and the process that paid for them.
+_import_time = perf_counter() - _import_start
+_import_pid = os.getpid()
+
 
 class AlienInvasion:
     # Overall class to manage the game.
 
-    def __init__(self):
-        # Initialize pygame, settings and screen object.
-        pygame.init()
+    def __init__(
+        self,
+        headless=False,
+        profile=False,
+        seed=None,
+        record_file=None,
+        history_file=game_history_file,
+        settings_file=None,
+        metrics=None,
+        settings_profile=None,
+        metrics_address=None,
+    ):
+        # Seconds spent in every phase of startup, for the startup report.
+        # The first game of the process that imported the game reports the
+        # imports too; processes forked from it got them for free.
+        global _import_time
+        self.startup_times = {}
+        if _import_time is not None and os.getpid() == _import_pid:
+            self.startup_times["imports"] = _import_time
+            _import_time = None
+        start = perf_counter()
 
-        self.settings = Settings()
-
-        self.screen = pygame.display.set_mode(
-            (
-                self.settings.screen_width,
-                self.settings.screen_height,
+        # Initialize pygame, settings and screen object.
+        self.headless = headless
+        self.settings = Settings(settings_file, settings_profile)
+
+        # Everything random in a game comes from its own seeded generator.
+        if seed is None:
+            seed = random.randrange(2**63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        if self.headless:
+            # Run without a window or audio device, draw nothing and don't
+            # wait after the ship is hit. Fonts start when text is first drawn.
+            self.settings.ship_hit_pause = 0
+            self.screen = pygame.Surface(
+                (
+                    self.settings.screen_width,
+                    self.settings.screen_height,
+                )
             )
+        else:
+            # Start only the display, fonts and sound start when first used.
+            pygame.display.init()
+            se.enable(self.settings.sound_channels)
+            if self.settings.fullscreen:
+                # Play on the whole display, at its own size.
+                self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+                self.settings.screen_width = self.screen.get_rect().width
+                self.settings.screen_height = self.screen.get_rect().height
+            else:
+                self.screen = pygame.display.set_mode(
+                    (
+                        self.settings.screen_width,
+                        self.settings.screen_height,
+                    )
+                )
+
+        # Draw at a lower internal resolution if asked to, and scale it up.
+        self.quality = None
+        self.render_surface = None
+        if not self.headless and (
+            self.settings.render_scale != 1.0 or self.settings.adaptive_quality
+        ):
+            self.quality = QualityController(self.settings)
+
+        if not self.headless:
+            pygame.display.set_caption("Alien Invasion")
+        start = self._time_startup("display", start)
+
+        # The field the game is played on, and the part of it on the screen.
+        self.playfield = pygame.Rect(
+            0,
+            0,
+            self.settings.playfield_width or self.settings.screen_width,
+            self.settings.playfield_height or self.settings.screen_height,
         )
-
-        # Fullscreen mode.
-        # self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        # self.settings.screen_width = self.screen.get_rect().width
-        # self.settings.screen_height = self.screen.get_rect().height
-
-        pygame.display.set_caption("Alien Invasion")
+        self.camera = (0, 0)
+        # The camera of the last frame shown on the screen.
+        self.presented_camera = None
+        # Whether the cursor should be visible, and whether it is.
+        self.mouse_visible = True
+        self.presented_mouse_visible = True
 
         # Make the Play button.
         self.play_button = Button(self, "Play")
 
+        # Keep the results of finished games, if a file is given.
+        self.history = GameHistory(history_file) if history_file else None
+        self.player = "human"
+
         # Create an instance of game stats.
         self.stats = GameStats(self)
+        start = self._time_startup("history", start)
 
         # Make a scoreboard.
         self.sb = Scoreboard(self)
@@ -53,65 +139,255 @@ class AlienInvasion:
         # Make a ship.
         self.ship = Ship(self)
 
-        # Make a group of bullets.
-        self.bullets = Group()
+        # Make a pool of bullets.
+        self.bullets = BulletPool(self)
 
-        # Make a group of aliens.
-        self.aliens = Group()
+        # Make a fleet of aliens.
+        self.aliens = Fleet(self)
 
         # Create the fleet of aliens.
         self._create_fleet()
 
-    def run_game(self):
-        # Start the main loop for the game.
-        while True:
-            self._check_events()
+        # Rects drawn in the last frame, None if the whole screen must be redrawn.
+        self.dirty_rects = None
+
+        # Time the phases of every frame if asked to.
+        self.profiler = None
+        if profile:
+            self.profiler = FrameProfiler(self, self.settings.profile_frames)
+
+        # Record the input of every step if asked to.
+        self.recorder = None
+        if record_file:
+            self.recorder = InputRecorder(record_file, self.seed)
+
+        # Count frames, shots and games into metrics if given. With a
+        # metrics_address, serve them there until the game loop ends.
+        self.metrics = metrics
+        self.metrics_server = None
+        if metrics_address:
+            # Serving metrics imports the HTTP server, slow to import, so
+            # only import it when metrics are on.
+            from metrics import GameMetrics, MetricsServer
+
+            if self.metrics is None:
+                self.metrics = GameMetrics()
+            self.metrics_server = MetricsServer(self.metrics, metrics_address)
+        self._time_startup("game objects", start)
+
+    def get_startup_report(self):
+        """Return the time every phase of startup took, as lines of text."""
+        lines = [
+            f"{phase:>14}: {seconds * 1000:8.2f} ms"
+            for phase, seconds in self.startup_times.items()
+        ]
+        total = sum(self.startup_times.values())
+        lines.append(f"{'total':>14}: {total * 1000:8.2f} ms")
+        return "\n".join(lines)
+
+    def _time_startup(self, phase, start):
+        """Record the time since start as a startup phase and return now."""
+        now = perf_counter()
+        self.startup_times[phase] = now - start
+        return now
+
+    def run_game(self, max_frames=None):
+        """Start the main loop for the game.
+
+        Stop after max_frames simulation steps if given. In headless mode the
+        loop runs as fast as possible, skips drawing and stops when the game
+        is over.
+        """
+        GameLoop(self, self._update_game).run(max_frames)
+
+    def _update_game(self):
+        """Advance the game by one simulation step."""
+        prof = self.profiler
+        if prof:
+            prof.lap(profiler.OTHER)
+
+        if self.recorder:
+            self.recorder.record_step(self)
+
+        # Remember the positions to draw in between this step and the next.
+        self.ship.previous_x = self.ship.x
+        for bullet in self.bullets.sprites():
+            bullet.previous_y = bullet.y
+        self.aliens.store_positions()
+
+        if self.stats.game_active and self.stats.pause_steps:
+            # Leave the player some time to relax.
+            self.stats.steps += 1
+            self.stats.pause_steps -= 1
+
+        elif self.stats.game_active:
+            self.stats.steps += 1
+
+            self.ship.update()
+            if prof:
+                prof.lap(profiler.SHIP)
 
-            if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
+            self._update_bullets()
+            if prof:
+                prof.lap(profiler.BULLETS)
 
-            self._update_screen()
+            self._update_aliens()
+            if prof:
+                prof.lap(profiler.ALIENS)
 
     def _check_events(self):
         """Respond to keyboard and mouse events."""
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self._store_high_score()
-                sys.exit()
+            self._check_event(event)
+
+    def _check_event(self, event):
+        """Respond to one keyboard, mouse or window event."""
+        if event.type == pygame.QUIT:
+            self._quit()
+
+        elif event.type == pygame.KEYDOWN:
+            self._check_keydown_events(event)
+
+        elif event.type == pygame.KEYUP:
+            self._check_keyup_events(event)
+
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_x, mouse_y = event.pos
+            self._check_play_button(mouse_x, mouse_y)
 
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
+        elif event.type == pygame.WINDOWEXPOSED:
+            # Parts of the window may be lost, redraw all of it.
+            self.dirty_rects = None
 
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
+    def _update_screen(self, alpha=1.0):
+        """Handle screen redraws.
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                self._check_play_button(mouse_x, mouse_y)
+        Draw moving objects alpha of the way from their positions at the
+        previous simulation step to the current ones.
+        """
+        self._present(self._get_draw_list(alpha))
+
+    def _present(self, draw_list):
+        """Draw a draw list to the screen and make it visible."""
+        if draw_list.mouse_visible != self.presented_mouse_visible:
+            pygame.mouse.set_visible(draw_list.mouse_visible)
+            self.presented_mouse_visible = draw_list.mouse_visible
+
+        if draw_list.camera != self.presented_camera:
+            # Everything on the screen moved.
+            self.dirty_rects = None
+            self.presented_camera = draw_list.camera
+
+        if self.quality:
+            self._present_scaled(draw_list)
+            return
+
+        if self.settings.dirty_rendering and self.dirty_rects is not None:
+            self._present_dirty(draw_list)
+            return
 
-    def _update_screen(self):
-        """Handle screen redraws."""
         # Redraw the screen.
         self.screen.fill(self.settings.bg_color)
+        self.dirty_rects = draw_list.draw(self.screen)
 
-        # Redraw all bullets behind the ship and aliens.
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
+        # Make the most recently drawn screen visible.
+        pygame.display.flip()
+
+    def _present_scaled(self, draw_list):
+        """Draw at the internal resolution and scale the frame to the screen."""
+        start = perf_counter()
+        scale = self.quality.scale
+
+        if scale == 1.0:
+            self.screen.fill(self.settings.bg_color)
+            draw_list.draw(self.screen)
+        else:
+            width, height = self.screen.get_size()
+            size = (round(width * scale), round(height * scale))
+            if self.render_surface is None or self.render_surface.get_size() != size:
+                self.render_surface = pygame.Surface(size, 0, self.screen)
+
+            self.render_surface.fill(self.settings.bg_color)
+            draw_list.draw_scaled(self.render_surface, scale)
+            pygame.transform.scale(self.render_surface, (width, height), self.screen)
+
+        # Leave the flip out, it may wait for the display.
+        self.quality.end_frame(perf_counter() - start)
+        pygame.display.flip()
+
+    def _present_dirty(self, draw_list):
+        """Redraw and update only the rects that changed since the last frame."""
+        # Erase everything drawn in the last frame.
+        for rect in self.dirty_rects:
+            self.screen.fill(self.settings.bg_color, rect)
 
-        self.ship.blitme()
-        self.aliens.draw(self.screen)
+        rects = draw_list.draw(self.screen)
+
+        # Update both the erased and the newly drawn parts of the screen.
+        pygame.display.update(self.dirty_rects + rects)
+        self.dirty_rects = rects
+
+    def get_frame(self):
+        """Return the pixels of the screen as a (width, height, 3) array.
+
+        The array is a view of the screen, not a copy, and shows the last
+        frame drawn. The screen is locked while the array exists, so delete
+        it before drawing again.
+        """
+        return pygame.surfarray.pixels3d(self.screen)
+
+    def _render_frame(self, alpha=1.0):
+        """Draw the whole frame to the screen without showing it."""
+        self.screen.fill(self.settings.bg_color)
+        self._get_draw_list(alpha).draw(self.screen)
+
+    def _move_camera(self, alpha):
+        """Keep the ship in view on a playfield larger than the screen.
+
+        Show the bottom of the playfield, centered on the ship as far as the
+        playfield reaches.
+        """
+        screen_rect = self.screen.get_rect()
+        if self.playfield.size == screen_rect.size:
+            return
+
+        ship_x = self.ship.x * alpha + self.ship.previous_x * (1 - alpha)
+        x = round(ship_x) + self.ship.rect.width // 2 - screen_rect.centerx
+        x = min(max(x, 0), max(self.playfield.width - screen_rect.width, 0))
+        y = max(self.playfield.height - screen_rect.height, 0)
+        self.camera = (x, y)
+
+    def _get_draw_list(self, alpha):
+        """Return a draw list of all game elements.
+
+        Moving objects are placed alpha of the way from their positions at
+        the previous simulation step to the current ones.
+        """
+        self._move_camera(alpha)
+        camera = self.camera
+        draw_list = DrawList(camera, self.mouse_visible)
+
+        # Draw all bullets behind the ship and aliens.
+        draw_list.blits(self.bullets.get_blits(alpha, camera))
+
+        draw_list.blits([self.ship.get_blit(alpha, camera)])
+        draw_list.blits(*self.aliens.get_blits(self.screen.get_rect(), alpha, camera))
 
         # Draw scores.
-        self.sb.show_score()
+        draw_list.blits(self.sb.get_blits())
 
         # Draw a play button if the game is inactive.
         if not self.stats.game_active:
-            self.play_button.draw_button()
+            button = self.play_button
+            draw_list.fill(button.button_color, [button.rect.copy()])
+            draw_list.blits([button.get_msg_blit()], button.rect.copy())
 
-        # Make the most recently drawn screen visible.
-        pygame.display.flip()
+        # Draw frame times below the scoreboard.
+        if self.profiler:
+            top = self.sb.level_rect.bottom + 10
+            draw_list.blits(self.profiler.get_overlay(top))
+
+        return draw_list
 
     def _check_keydown_events(self, event):
         """Respond to keypresses."""
@@ -129,8 +405,7 @@ class AlienInvasion:
                 self._start_game()
 
         elif event.key == pygame.K_q:
-            self._store_high_score()
-            sys.exit()
+            self._quit()
 
     def _check_keyup_events(self, event):
         """Respond to key releases."""
@@ -141,42 +416,60 @@ class AlienInvasion:
             self.ship.moving_right = False
 
     def _fire_bullet(self):
-        """Create a new bullet and add it to the bullets group."""
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
-            se.bullet_sound.play()
+        """Fire a bullet from the pool if the limit allows it."""
+        if self.recorder:
+            self.recorder.record_action(input_log.FIRE)
+
+        # Hold fire while the game waits after the ship was hit.
+        if self.stats.pause_steps:
+            return
+
+        if self.bullets.fire():
+            se.play(se.BULLET)
+            if self.metrics:
+                self.metrics.bullets_fired += 1
 
     def _update_bullets(self):
-        """Redraw bullets."""
+        """Move bullets and release the off-screen ones."""
         self.bullets.update()
 
-        # Delete off-screen bullets.
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
-
         self._check_bullet_alien_collisions()
 
     def _create_fleet(self):
-        """Create a full fleet of aliens."""
-        # Create an alien and find the number of aliens in the row.
-        # The distance between aliens is one alien width.
-        alien = Alien(self)
-        number_aliens_x = self._get_number_columns(alien.rect.width)
-        number_aliens_y = self._get_number_rows(alien.rect.height)
-
-        # Create the fleet of aliens.
-        for row_number in range(number_aliens_y):
-            for column_number in range(number_aliens_x):
-                self._create_alien(column_number, row_number)
+        """Create a full fleet of aliens, with every wave stacked above the last."""
+        # Find the number of aliens in the row.
+        # The distance between aliens is one alien width at density 1.
+        alien_width = self.aliens.width
+        alien_height = self.aliens.height
+        spacing = 1 + 1 / self.settings.fleet_density
+        number_aliens_x = self._get_number_columns(alien_width, spacing)
+        number_aliens_y = self._get_number_rows(alien_height, spacing)
+
+        # Waves above the first one start above the playfield and come
+        # into it as the fleet drops.
+        number_rows = number_aliens_y * self.settings.fleet_waves
+        wave_offset = round(alien_height * spacing * (number_rows - number_aliens_y))
+
+        # Create the fleet of aliens row by row.
+        column_numbers, row_numbers = np.meshgrid(
+            np.arange(number_aliens_x), np.arange(number_rows)
+        )
+        self.aliens.add(
+            alien_width + np.round(alien_width * spacing * column_numbers.ravel()),
+            alien_height
+            + np.round(alien_height * spacing * row_numbers.ravel()).astype(np.int64)
+            - wave_offset,
+        )
 
     def _start_game(self):
+        if self.recorder:
+            self.recorder.record_action(input_log.START)
+
         # Reset dynamic game settings.
         self.settings.initialize_dynamic_settings()
 
         # Hide the mouse cursor.
-        pygame.mouse.set_visible(False)
+        self._set_mouse_visible(False)
 
         # Reset game stats.
         self.stats.reset_stats()
@@ -197,11 +490,13 @@ class AlienInvasion:
         # Destroy all bullets, increase the game tempo and refill the aliens.
         self.bullets.empty()
         self.settings.increase_speed()
+        # Drop the destroyed fleet, so the new one doesn't add to it.
+        self.aliens.empty()
         self._create_fleet()
 
         # Increase the level.
         self.stats.level += 1
-        self.sb.prep_level()
+        self.sb.request_update("level")
 
     def _ship_hit(self):
         """Respond to alien-ship collision."""
@@ -210,7 +505,7 @@ class AlienInvasion:
             self.stats.ships_left -= 1
 
             # Update scoreboard.
-            self.sb.prep_ships()
+            self.sb.request_update("ships")
 
             # Clean the screen from aliens and bullets.
             self.aliens.empty()
@@ -220,12 +515,32 @@ class AlienInvasion:
             self.ship.center_ship()
             self._create_fleet()
 
-            # Leave the player some time to relax.
-            sleep(0.5)
+            # Wait a moment, still drawing and handling events.
+            self.stats.pause_steps = round(
+                self.settings.ship_hit_pause * self.settings.steps_per_second
+            )
 
         else:
-            self.stats.game_active = False
-            pygame.mouse.set_visible(True)
+            # The last ship is lost as well.
+            self._end_game(self.settings.ship_limit)
+
+    def _end_game(self, ships_lost):
+        """Stop the game and record its results."""
+        self.stats.game_active = False
+        self._set_mouse_visible(True)
+
+        if self.history:
+            self.history.record_game(
+                self.player,
+                self.stats.score,
+                self.stats.level,
+                ships_lost,
+                monotonic() - self.stats.start_time,
+                self.stats.steps,
+            )
+
+        if self.metrics:
+            self.metrics.end_game(self.stats.score, self.stats.level)
 
     def _check_play_button(self, mouse_x, mouse_y):
         """Start a new game if Play is pressed."""
@@ -237,14 +552,20 @@ class AlienInvasion:
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collisions."""
         # Check whether there is any collision between a bullet and an alien.
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+        collisions = self.aliens.groupcollide(self.bullets, True)
 
         if collisions:
             for aliens in collisions.values():
                 self.stats.score += len(aliens) * self.settings.alien_points
-                self.sb.prep_score()
-                self.sb.prep_high_score()
-                se.alien_sound.play()
+
+            # One explosion per frame, however many aliens were hit.
+            se.play(se.ALIEN)
+
+            if self.metrics:
+                self.metrics.bullet_hits += len(collisions)
+                self.metrics.aliens_killed += sum(map(len, collisions.values()))
+
+            self.sb.request_update("score", "high_score")
 
             self._check_high_score()
 
@@ -252,13 +573,9 @@ class AlienInvasion:
             self._start_new_level()
 
     def _check_aliens_bottom(self):
-        """Check if any alien has reached the bottom of the screen."""
-        screen_rect = self.screen.get_rect()
-
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= screen_rect.height:
-                self._ship_hit()
-                break
+        """Check if any alien has reached the bottom of the playfield."""
+        if self.aliens.check_bottom(self.playfield.height):
+            self._ship_hit()
 
     def _update_aliens(self):
         """Update the positions of all aliens in the fleet."""
@@ -266,7 +583,7 @@ class AlienInvasion:
         self.aliens.update()
 
         # Look for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.aliens.collideany(self.ship.rect):
             self._ship_hit()
 
         # Look for alien-bottom collisions.
@@ -274,54 +591,84 @@ class AlienInvasion:
 
     def _check_fleet_edges(self):
         """Respond appropriately if any alien has reached an edge."""
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.check_edges():
+            self._change_fleet_direction()
 
     def _change_fleet_direction(self):
         """Drop the fleet and reverse the direction."""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
-
-        self.settings.fleet_direction *= -1
+        self.aliens.change_direction()
 
     def _check_high_score(self):
         # Update the high score.
         if self.stats.score > self.stats.high_score:
             self.stats.high_score = self.stats.score
-            self.sb.prep_high_score()
+            self.sb.request_update("high_score")
 
-    def _get_number_columns(self, alien_width):
+    def _get_number_columns(self, alien_width, spacing=2):
         """Calculate the amount of aliens that fit into one row."""
-        available_space_x = self.settings.screen_width - (2 * alien_width)
-        number_aliens_x = int(available_space_x / (2 * alien_width))
+        available_space_x = self.playfield.width - (2 * alien_width)
+        number_aliens_x = int(available_space_x / (spacing * alien_width))
         return number_aliens_x
 
-    def _get_number_rows(self, alien_height):
+    def _get_number_rows(self, alien_height, spacing=2):
         """Calculate the amount of alien rows."""
-        available_space_y = self.settings.screen_height - (
+        available_space_y = self.playfield.height - (
             3 * alien_height + self.ship.rect.height
         )
-        number_aliens_y = int(available_space_y / (2 * alien_height))
+        number_aliens_y = int(available_space_y / (spacing * alien_height))
         return number_aliens_y
 
-    def _create_alien(self, alien_number_x, alien_number_y):
-        """Create an alien and place it in the row."""
-        alien = Alien(self)
-        alien_width = alien.rect.width
-        alien_height = alien.rect.height
-        alien.x = alien_width + (2 * alien_number_x * alien_width)
-        alien.rect.x = alien.x
-        alien.rect.y = alien_height + (2 * alien_number_y * alien_height)
-        self.aliens.add(alien)
+    def _set_mouse_visible(self, visible):
+        """Show or hide the mouse cursor with the next frame shown.
+
+        The cursor belongs to the window, so it is changed by _present(),
+        on the thread that shows the frames.
+        """
+        self.mouse_visible = visible
 
-    def _store_high_score(self):
-        with open(game_stats_file, "w") as file:
-            json.dump(self.stats.high_score, file)
+    def _quit(self):
+        """Save the results and exit the game."""
+        if self.stats.game_active:
+            self._end_game(self.settings.ship_limit - self.stats.ships_left)
+
+        sys.exit()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="show frame times and save them to a file on exit",
+    )
+    parser.add_argument("--record", help="record the input of the game to this file")
+    parser.add_argument("--settings", help="load settings from this profile file")
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print how long every phase of startup took",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="ADDRESS",
+        help="serve Prometheus metrics on this port, host:port or Unix socket",
+    )
+    parser.add_argument(
+        "--render-thread",
+        action="store_true",
+        help="run the game on a second thread and draw on the main one",
+    )
+    args = parser.parse_args()
+
     # Make a game instance and run the game.
-    ai = AlienInvasion()
+    ai = AlienInvasion(
+        profile=args.profile,
+        record_file=args.record,
+        settings_file=args.settings,
+        metrics_address=args.metrics,
+    )
+    if args.render_thread:
+        ai.settings.render_thread = True
+    if args.startup_report:
+        print(ai.get_startup_report())
     ai.run_game()
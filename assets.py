@@ -0,0 +1,48 @@
+"""A shared cache of the images and fonts used by Alien Invasion."""
+import pygame
+
+# Loaded images, keyed by file name and size (None for the original size).
+_images = {}
+
+# Loaded fonts, keyed by size.
+_fonts = {}
+
+
+def get_image(file_name, size=None):
+    """Return a shared surface of the image, scaled to size if given.
+
+    Every image is loaded from disk only once. If a display mode is set,
+    the image is converted to the display format to blit faster. The
+    surfaces are shared, so callers must not draw on them.
+    """
+    key = (file_name, size)
+    image = _images.get(key)
+
+    if image is None:
+        if size is None:
+            image = pygame.image.load(file_name)
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
+        else:
+            image = pygame.transform.scale(get_image(file_name), size)
+
+        _images[key] = image
+
+    return image
+
+
+def get_font(size):
+    """Return a shared handle of the default font in the given size.
+
+    The font module is started when the first font is needed. The font is
+    loaded straight from pygame, skipping the scan of system fonts that
+    pygame.font.SysFont(None, size) does before it falls back to it.
+    """
+    font = _fonts.get(size)
+
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[size] = pygame.font.Font(None, size)
+
+    return font
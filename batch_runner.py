@@ -0,0 +1,177 @@
+"""Play many Alien Invasion games with the bot in parallel."""
+import argparse
+import json
+import statistics
+import time
+from multiprocessing import Pool, Value
+from multiprocessing.util import Finalize
+
+from ai_player import AIPlayer
+from alien_invasion import AlienInvasion
+
+# Results collected for every game.
+result_keys = ("score", "level", "frames", "startup_time", "wall_time")
+
+# Metrics of the games played by this worker process, if it serves them.
+_worker_metrics = None
+
+
+def play_game(seed, max_frames=None, player_class=AIPlayer, settings_file=None):
+    """Play one headless game with the given seed and return its results."""
+    start = time.perf_counter()
+
+    ai_game = AlienInvasion(
+        headless=True,
+        seed=seed,
+        settings_file=settings_file,
+        metrics=_worker_metrics,
+    )
+    player_class(ai_game).run_game(max_frames)
+
+    return {
+        "seed": seed,
+        "score": ai_game.stats.score,
+        "level": ai_game.stats.level,
+        "frames": ai_game.frames,
+        "startup_time": sum(ai_game.startup_times.values()),
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def run_batch(
+    games,
+    workers=None,
+    max_frames=None,
+    first_seed=0,
+    player_class=AIPlayer,
+    settings_file=None,
+    metrics_address=None,
+):
+    """Play games across a pool of worker processes, one seed per game.
+
+    Use as many workers as there are CPUs if workers is None. Return the
+    results of all games ordered by seed.
+
+    With metrics_address, every worker serves the metrics of its games:
+    worker i on the port plus i, or on the Unix socket path with ".i" added.
+    """
+    tasks = [
+        (seed, max_frames, player_class, settings_file)
+        for seed in range(first_seed, first_seed + games)
+    ]
+
+    initializer, initargs = None, ()
+    if metrics_address:
+        initializer = _serve_worker_metrics
+        initargs = (metrics_address, Value("i", 0))
+
+    with Pool(workers, initializer, initargs) as pool:
+        results = pool.starmap(play_game, tasks, chunksize=max(1, games // 64))
+
+        # Let the workers exit on their own, so they stop serving metrics.
+        pool.close()
+        pool.join()
+
+    return results
+
+
+def _serve_worker_metrics(address, worker_count):
+    """Start serving the metrics of this worker, the next one counted."""
+    global _worker_metrics
+
+    # The HTTP server is slow to import, so only workers serving metrics do.
+    from metrics import GameMetrics, MetricsServer
+
+    with worker_count.get_lock():
+        index = worker_count.value
+        worker_count.value += 1
+
+    _worker_metrics = GameMetrics()
+    server = MetricsServer(_worker_metrics, _get_worker_address(address, index))
+    # Stop serving, and remove the socket file, when the worker exits.
+    Finalize(None, server.close, exitpriority=10)
+
+
+def _get_worker_address(address, index):
+    """Return the metrics address of the worker with the given index."""
+    if "/" in address:
+        return f"{address}.{index}"
+
+    host, _, port = address.rpartition(":")
+    port = int(port) + index
+    return f"{host}:{port}" if host else str(port)
+
+
+def summarize(results):
+    """Return summary statistics of every result over all games."""
+    summary = {"games": len(results)}
+
+    for key in result_keys:
+        values = [result[key] for result in results]
+        summary[key] = {
+            "mean": statistics.fmean(values),
+            "median": statistics.median(values),
+            "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+            "min": min(values),
+            "max": max(values),
+        }
+
+    return summary
+
+
+def _print_summary(summary, elapsed):
+    """Print the summary as a table."""
+    print(f"Games: {summary['games']}, elapsed: {elapsed:.2f} s")
+    print(f"{'':>12} {'mean':>12} {'median':>12} {'stdev':>12} {'min':>12} {'max':>12}")
+
+    for key in result_keys:
+        stats = summary[key]
+        print(
+            f"{key:>12}"
+            + "".join(
+                f" {stats[name]:>12.2f}"
+                for name in ("mean", "median", "stdev", "min", "max")
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play many headless bot games in parallel."
+    )
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=None,
+        help="stop every game after this many frames",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--output", help="write all results to this JSON file")
+    parser.add_argument("--settings", help="load settings from this profile file")
+    parser.add_argument(
+        "--metrics",
+        metavar="ADDRESS",
+        help="serve Prometheus metrics of every worker on this port plus the "
+        "worker's index, or on this Unix socket path with .index added",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(
+        args.games,
+        args.workers,
+        args.max_frames,
+        args.seed,
+        settings_file=args.settings,
+        metrics_address=args.metrics,
+    )
+    summary = summarize(results)
+    _print_summary(summary, time.perf_counter() - start)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"summary": summary, "games": results}, file, indent=2)
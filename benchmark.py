@@ -0,0 +1,255 @@
+"""Benchmarks for the core game loop of Alien Invasion."""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from time import perf_counter_ns
+
+import numpy as np
+import pygame
+
+from ai_player import AIPlayer
+from alien_invasion import AlienInvasion
+
+
+class Scenario:
+    """A fixed way of driving a headless game for a number of frames."""
+
+    def __init__(self, name, frames, warmup=100, render=True, settings_file=None):
+        """Initialize the scenario, with settings from a profile file if given."""
+        self.name = name
+        self.frames = frames
+        self.warmup = warmup
+        self.render = render
+        self.settings_file = settings_file
+
+    def setup(self, game):
+        """Prepare the game before the first frame."""
+        game._start_game()
+
+    def frame(self, game):
+        """Run one frame of the scenario."""
+        # Never run out of ships, so every frame does the same kind of work.
+        game.stats.ships_left = game.settings.ship_limit
+        game._update_game()
+
+        if self.render:
+            game._render_frame()
+
+
+class ManyBulletsScenario(Scenario):
+    """The ship sweeps the screen firing every frame with no bullet limit."""
+
+    def setup(self, game):
+        game.settings.bullets_allowed = 10**9
+        game.ship.moving_right = True
+        super().setup(game)
+
+    def frame(self, game):
+        ship = game.ship
+        if ship.rect.right >= ship.playfield.right:
+            ship.moving_right, ship.moving_left = False, True
+        elif ship.rect.left <= 0:
+            ship.moving_right, ship.moving_left = True, False
+
+        game._fire_bullet()
+        super().frame(game)
+
+
+class LevelTransitionScenario(Scenario):
+    """A new level starts every frame."""
+
+    def frame(self, game):
+        # Keep the speed from growing without bounds.
+        game.settings.initialize_dynamic_settings()
+        game._start_new_level()
+        super().frame(game)
+
+
+class AIPlayerScenario(Scenario):
+    """Games played by the bot back to back, a frame is one simulation step.
+
+    A new game starts as soon as one is over, so every timed frame plays.
+    """
+
+    def setup(self, game):
+        self.ai_player = AIPlayer(game)
+        game.stats.game_active = True
+
+    def frame(self, game):
+        if not game.stats.game_active:
+            game._start_game()
+        self.ai_player._step()
+
+
+scenarios = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("default_fleet", frames=5000),
+        Scenario(
+            "large_fleet",
+            frames=2000,
+            render=False,
+            settings_file="profiles/large_fleet.json",
+        ),
+        Scenario(
+            "load_test_fleet",
+            frames=500,
+            warmup=10,
+            settings_file="profiles/load_test.json",
+        ),
+        ManyBulletsScenario("many_bullets", frames=5000),
+        LevelTransitionScenario("level_transitions", frames=2000),
+        AIPlayerScenario("ai_player_game", frames=50000, warmup=0, render=False),
+    )
+}
+
+
+def run_scenario(name, frame_scale=1.0, seed=0):
+    """Run a scenario and return its results.
+
+    Every scenario should run in a fresh process, so the peak memory
+    reported belongs to it alone.
+    """
+    scenario = scenarios[name]
+    game = AlienInvasion(
+        headless=True,
+        seed=seed,
+        history_file=None,
+        settings_file=scenario.settings_file,
+    )
+    scenario.setup(game)
+
+    for _ in range(scenario.warmup):
+        scenario.frame(game)
+
+    frames = max(1, int(scenario.frames * frame_scale))
+    times = np.empty(frames, dtype=np.int64)
+
+    start = perf_counter_ns()
+    for frame in range(frames):
+        frame_start = perf_counter_ns()
+        scenario.frame(game)
+        times[frame] = perf_counter_ns() - frame_start
+    total = perf_counter_ns() - start
+
+    p50, p90, p99 = np.percentile(times, (50, 90, 99)) / 1e6
+    return {
+        "frames": frames,
+        "fps": frames / (total / 1e9),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(times.max() / 1e6),
+        # Linux reports kilobytes.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_benchmarks(names, frame_scale=1.0, seed=0):
+    """Run the scenarios, each in its own process, and return all results."""
+    context = multiprocessing.get_context("spawn")
+    results = {}
+
+    for name in names:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(run_scenario, (name, frame_scale, seed))
+        _print_result(name, results[name])
+
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "frame_scale": frame_scale,
+            "seed": seed,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions of results against the baseline.
+
+    A scenario regresses if its frame rate drops or its p99 frame time
+    grows by more than threshold, given as a fraction.
+    """
+    regressions = []
+
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+
+        if result["fps"] < base["fps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: fps {result['fps']:.1f} < baseline {base['fps']:.1f}"
+            )
+        if result["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p99 {result['p99_ms']:.3f} ms > "
+                f"baseline {base['p99_ms']:.3f} ms"
+            )
+
+    return regressions
+
+
+def _print_result(name, result):
+    """Print the results of a scenario on one line."""
+    print(
+        f"{name:<18} {result['fps']:>10.1f} fps"
+        f"  p50 {result['p50_ms']:.3f} ms  p90 {result['p90_ms']:.3f} ms"
+        f"  p99 {result['p99_ms']:.3f} ms  peak {result['peak_rss_mb']:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game loop.")
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        default=list(scenarios),
+        help=f"scenarios to run (default: all of {', '.join(scenarios)})",
+    )
+    parser.add_argument(
+        "--frame-scale",
+        type=float,
+        default=1.0,
+        help="multiply the number of frames of every scenario",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results in this JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown against the baseline (default: 0.1)",
+    )
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(scenarios)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.scenarios, args.frame_scale, args.seed)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+
+        if regressions:
+            sys.exit(1)
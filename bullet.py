@@ -1,27 +1,37 @@
-"""A bullet that is shot by the ship."""
+"""Bullets that are shot by the ship."""
 import pygame
-from pygame.sprite import Sprite
 
 
-class Bullet(Sprite):
-    """A class to manage bullets fired from the ship."""
+class Bullet:
+    """A class to manage a bullet fired from the ship.
 
-    def __init__(self, game):
-        """Create a bullet object at the ship's current position."""
-        super().__init__()
-        self.screen = game.screen
+    Bullets are kept in a BulletPool and reused for many shots.
+    """
+
+    __slots__ = ("rect", "y", "previous_y", "speed_factor", "live")
 
-        # Create a bullet rect at (0, 0) and correct the position.
+    def __init__(self, game):
+        """Create a bullet that is not fired yet."""
+        # Create a bullet rect at (0, 0), it's moved into place when fired.
         self.rect = pygame.Rect(
             0, 0, game.settings.bullet_width, game.settings.bullet_height
         )
+        self.y = 0.0
+        self.previous_y = 0.0
+
+        self.speed_factor = game.settings.bullet_speed_factor
+        self.live = False
+
+    def fire(self, game):
+        """Place the bullet at the ship's current position."""
         self.rect.midtop = game.ship.rect.midtop
 
         # Store the bullet's position as a decimal value.
         self.y = float(self.rect.y)
+        self.previous_y = self.y
 
-        self.color = game.settings.bullet_color
         self.speed_factor = game.settings.bullet_speed_factor
+        self.live = True
 
     def update(self):
         """Move the bullet up the screen."""
@@ -30,6 +40,101 @@ class Bullet(Sprite):
         # Update the rect position.
         self.rect.y = self.y
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def get_rect(self, alpha=1.0, camera=(0, 0)):
+        """Return a new rect of where to draw the bullet on the screen.
+
+        Place it alpha of the way from its previous position to the current
+        one, with the playfield position camera at the top left of the screen.
+        """
+        rect = self.rect.copy()
+        rect.x -= camera[0]
+        rect.y = self.y * alpha + self.previous_y * (1 - alpha) - camera[1]
+        return rect
+
+
+class BulletPool:
+    """The bullets in flight, and the bullets ready to be fired again.
+
+    Bullets are only created when no fired one can be reused, and never
+    more than bullets_allowed of them are in flight. Bullets are released
+    in place, without copying the list of bullets in flight.
+    """
+
+    def __init__(self, game):
+        """Initialize an empty pool."""
+        self.game = game
+        self.settings = game.settings
+
+        # Bullets in flight, in the order they were fired, and spare bullets.
+        self.bullets = []
+        self.spare = []
+
+        # One image of a bullet, to draw all bullets with a single blits call.
+        size = self.settings.bullet_width, self.settings.bullet_height
+        self.image = pygame.Surface(size)
+        self.image.fill(self.settings.bullet_color)
+
+    def __len__(self):
+        """Return the number of bullets in flight."""
+        return len(self.bullets)
+
+    def sprites(self):
+        """Return the bullets in flight, which callers must not change."""
+        return self.bullets
+
+    def get_blits(self, alpha=1.0, camera=(0, 0)):
+        """Return (image, rect) pairs that draw the bullets in flight."""
+        image = self.image
+        return [(image, bullet.get_rect(alpha, camera)) for bullet in self.bullets]
+
+    def fire(self):
+        """Fire a bullet if allowed and return it, otherwise return None."""
+        if len(self.bullets) >= self.settings.bullets_allowed:
+            return None
+
+        bullet = self.spare.pop() if self.spare else Bullet(self.game)
+        bullet.fire(self.game)
+        self.bullets.append(bullet)
+        return bullet
+
+    def update(self):
+        """Move all bullets and release those that have left the screen."""
+        gone = False
+        for bullet in self.bullets:
+            bullet.update()
+            if bullet.rect.bottom <= 0:
+                bullet.live = False
+                gone = True
+
+        if gone:
+            self._release_dead()
+
+    def remove(self, *bullets):
+        """Release the given bullets."""
+        for bullet in bullets:
+            bullet.live = False
+
+        self._release_dead()
+
+    def empty(self):
+        """Release all bullets."""
+        for bullet in self.bullets:
+            bullet.live = False
+
+        self.spare.extend(self.bullets)
+        self.bullets.clear()
+
+    def _release_dead(self):
+        """Move bullets that are not live any more to the spare ones."""
+        bullets = self.bullets
+        kept = 0
+
+        # Keep the live bullets in order at the start of the list.
+        for bullet in bullets:
+            if bullet.live:
+                bullets[kept] = bullet
+                kept += 1
+            else:
+                self.spare.append(bullet)
+
+        del bullets[kept:]
@@ -1,31 +1,37 @@
-import pygame.font
+import pygame
+
+import assets
 
 
 class Button:
     """A button to start/resume the game."""
 
     def __init__(self, game, msg):
-        self.screen = game.screen
         self.screen_rect = game.screen.get_rect()
 
         # Initialize button properties.
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
 
         # Build the button's rect and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.center = self.screen_rect.center
 
-        self._prep_msg(msg)
+        # The message is rendered when the button is first drawn.
+        self.msg = msg
+        self.msg_image = None
 
     def _prep_msg(self, msg):
         """Get a message and display it on the button in the center of the screen."""
-        self.msg_image = self.font.render(msg, True, self.text_color, self.button_color)
+        font = assets.get_font(48)
+        self.msg_image = font.render(msg, True, self.text_color, self.button_color)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
-    def draw_button(self):
-        self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+    def get_msg_blit(self):
+        """Return the message image and where it is drawn on the button."""
+        if self.msg_image is None:
+            self._prep_msg(self.msg)
+
+        return self.msg_image, self.msg_image_rect
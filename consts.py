@@ -1 +1,5 @@
+game_history_file = "game_history.db"
+# Where older versions kept the high score.
 game_stats_file = "game_stats.json"
+alien_image_file = "images/alien.bmp"
+ship_image_file = "images/ship.bmp"
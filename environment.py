@@ -0,0 +1,405 @@
+"""Reinforcement learning environments for Alien Invasion."""
+import itertools
+import random
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from alien_invasion import AlienInvasion
+
+# Environments take the same actions as game states.
+from game_state import (
+    FIRE,
+    LEFT,
+    LEFT_FIRE,
+    NOOP,
+    RIGHT,
+    RIGHT_FIRE,
+    action_count,
+    moves,
+)
+
+
+class AlienInvasionEnv:
+    """A headless game with a reset()/step() interface.
+
+    Observations are float32 vectors: the ship's x position, the fleet
+    direction and speed, the ships left and the level, the number of aliens
+    left, the bounding box of the fleet, the position of the lowest alien
+    and the positions of the bullets in flight. Positions are fractions of
+    the playfield size; bullet slots without a bullet hold -1. The reward of a
+    step is the score it earned.
+
+    With pixel_scale, observations are instead the last stack_size frames
+    of the game as a FrameStack, downsampled pixel_scale times.
+    """
+
+    def __init__(
+        self, frame_skip=1, pixel_scale=None, stack_size=4, settings_file=None
+    ):
+        """Make a headless game, repeating every action frame_skip steps."""
+        self.game = AlienInvasion(
+            headless=True, history_file=None, settings_file=settings_file
+        )
+        self.frame_skip = frame_skip
+
+        self.bullet_slots = self.game.settings.bullets_allowed
+        self.frames = None
+        if pixel_scale:
+            self.frames = FrameStack(self.game, pixel_scale, stack_size)
+            self.observation = self.frames.frames
+        else:
+            self.observation = np.zeros(12 + 2 * self.bullet_slots, dtype=np.float32)
+        self.observation_shape = self.observation.shape
+        self.observation_dtype = self.observation.dtype
+
+    def reset(self, seed=None):
+        """Start a new game and return the first observation."""
+        game = self.game
+        game.rng = random.Random(seed)
+        game.seed = seed
+
+        game._start_game()
+        self.fleet_size = len(game.aliens)
+        self.score = 0
+        if self.frames:
+            self.frames.reset()
+
+        return self.get_observation()
+
+    def step(self, action):
+        """Apply the action and return observation, reward, done and info."""
+        game = self.game
+        moving_left, moving_right, fire = moves[action]
+        game.ship.moving_left = moving_left
+        game.ship.moving_right = moving_right
+        if fire:
+            game._fire_bullet()
+
+        for _ in range(self.frame_skip):
+            game._update_game()
+            if not game.stats.game_active:
+                break
+
+        reward = game.stats.score - self.score
+        self.score = game.stats.score
+        done = not game.stats.game_active
+        if self.frames:
+            self.frames.capture()
+        info = {"level": game.stats.level, "ships_left": game.stats.ships_left}
+
+        return self.get_observation(), reward, done, info
+
+    def get_observation(self, out=None):
+        """Write the observation into out, or an internal buffer, and return it.
+
+        The internal buffer is overwritten by the next call.
+        """
+        if self.frames:
+            if out is None:
+                return self.observation
+            out[...] = self.observation
+            return out
+
+        if out is None:
+            out = self.observation
+
+        game = self.game
+        settings = game.settings
+        width, height = game.playfield.size
+        aliens = game.aliens
+
+        out[0] = game.ship.x / width
+        out[1] = settings.fleet_direction
+        out[2] = settings.alien_speed_factor
+        out[3] = game.stats.ships_left / settings.ship_limit
+        out[4] = game.stats.level
+        out[5] = len(aliens) / max(self.fleet_size, 1)
+
+        if len(aliens):
+            bounds = aliens.get_bounds()
+            out[6] = bounds.left / width
+            out[7] = bounds.right / width
+            out[8] = bounds.top / height
+            out[9] = bounds.bottom / height
+
+            lowest = aliens.get_lowest_alien()
+            out[10] = aliens.rect_x[lowest] / width
+            out[11] = aliens.y[lowest] / height
+        else:
+            out[6:12] = 0
+
+        bullets = out[12:].reshape(self.bullet_slots, 2)
+        bullets.fill(-1)
+        for slot, bullet in zip(range(self.bullet_slots), game.bullets.sprites()):
+            bullets[slot] = bullet.rect.x / width, bullet.y / height
+
+        return out
+
+
+class FrameStack:
+    """The last frames of a game, in grayscale and downsampled.
+
+    frames is a uint8 array of (size, height, width), oldest frame first.
+    All arrays are allocated once; a new frame is read straight from the
+    screen's pixels, taking every scale-th pixel in both directions, and
+    converted into the stack in place.
+    """
+
+    def __init__(self, game, scale=4, size=4):
+        """Make an empty stack of size frames, scale times smaller than the screen."""
+        self.game = game
+        self.scale = scale
+
+        width = -(-game.settings.screen_width // scale)
+        height = -(-game.settings.screen_height // scale)
+        self.frames = np.zeros((size, height, width), dtype=np.uint8)
+
+        # Work space to mix the color channels in.
+        self.gray = np.empty((height, width), dtype=np.uint16)
+        self.channel = np.empty((height, width), dtype=np.uint16)
+
+    def reset(self):
+        """Fill the whole stack with the current frame."""
+        self._capture_into(self.frames[-1])
+        self.frames[:-1] = self.frames[-1]
+
+    def capture(self):
+        """Drop the oldest frame and add the current one."""
+        frames = self.frames
+        # Shift one frame at a time, so no copy overlaps and none is buffered.
+        for index in range(len(frames) - 1):
+            frames[index] = frames[index + 1]
+
+        self._capture_into(frames[-1])
+
+    def _capture_into(self, frame):
+        """Draw the game and store its frame in grayscale in frame."""
+        self.game._render_frame()
+
+        pixels = self.game.get_frame()
+        # Every scale-th pixel, with rows first, still without a copy.
+        small = pixels[:: self.scale, :: self.scale].transpose(1, 0, 2)
+
+        # Luma from integer weights that add up to 256.
+        gray, channel = self.gray, self.channel
+        np.multiply(small[..., 0], 77, out=gray, dtype=np.uint16)
+        np.multiply(small[..., 1], 150, out=channel, dtype=np.uint16)
+        gray += channel
+        np.multiply(small[..., 2], 29, out=channel, dtype=np.uint16)
+        gray += channel
+        gray >>= 8
+        np.copyto(frame, gray, casting="unsafe")
+
+        # Unlock the screen for the next frame.
+        del pixels, small
+
+
+class VectorEnv:
+    """Many environments stepped in lockstep, with batched NumPy results.
+
+    The environments are split across worker processes, or stepped in this
+    process if workers is 0. Workers write observations, rewards and done
+    flags straight into shared memory. A finished game is reset right away,
+    so its done flag belongs to the last step of the old game and its
+    observation to the first step of the new one.
+
+    Environment i plays the games seeded seed + i, seed + i + env_count,
+    seed + i + 2 * env_count and so on, whether reset() or a finished game
+    starts them, so no two games share a seed.
+
+    The arrays returned by reset() and step() are overwritten by the next
+    call; copy them to keep them.
+    """
+
+    def __init__(
+        self,
+        env_count,
+        workers=0,
+        frame_skip=1,
+        pixel_scale=None,
+        stack_size=4,
+        settings_file=None,
+        seed=0,
+    ):
+        """Make env_count environments, seeded from seed on.
+
+        The other arguments are passed on to every AlienInvasionEnv.
+        """
+        self.env_count = env_count
+        self.seed = seed
+        env_options = (frame_skip, pixel_scale, stack_size, settings_file)
+
+        # Find the shape of observations from one environment.
+        env = AlienInvasionEnv(*env_options)
+        layout = (env_count, env.observation_shape, env.observation_dtype)
+
+        # One block of shared memory for actions, rewards, dones and observations.
+        self.memory = SharedMemory(create=True, size=_memory_size(*layout))
+        (
+            self.actions,
+            self.rewards,
+            self.dones,
+            self.observations,
+        ) = _memory_arrays(self.memory, *layout)
+
+        self.workers = []
+        if workers:
+            # Give every worker an even slice of the environments.
+            bounds = np.linspace(0, env_count, workers + 1).astype(int)
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                if start == stop:
+                    continue
+                connection, worker_connection = Pipe()
+                process = Process(
+                    target=_run_worker,
+                    args=(
+                        worker_connection,
+                        self.memory.name,
+                        layout,
+                        start,
+                        stop,
+                        env_options,
+                        seed,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                self.workers.append((process, connection))
+        else:
+            self.envs = [env] + [
+                AlienInvasionEnv(*env_options) for _ in range(env_count - 1)
+            ]
+            _give_seeds(self.envs, 0, env_count, seed)
+
+    def reset(self):
+        """Start new games in all environments and return the observations."""
+        if self.workers:
+            self._send_all(("reset", None))
+        else:
+            _reset_envs(self.envs, 0, self.observations)
+
+        return self.observations
+
+    def step(self, actions):
+        """Step every environment with its action.
+
+        Return arrays of observations, rewards and done flags.
+        """
+        self.actions[:] = actions
+
+        if self.workers:
+            self._send_all(("step", None))
+        else:
+            _step_envs(
+                self.envs, 0, self.actions, self.observations, self.rewards, self.dones
+            )
+
+        return self.observations, self.rewards, self.dones
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        for process, connection in self.workers:
+            connection.send(("close", None))
+            process.join()
+        self.workers = []
+
+        # Drop the views before the memory they point into.
+        del self.actions, self.rewards, self.dones, self.observations
+        self.memory.close()
+        self.memory.unlink()
+
+    def _send_all(self, command):
+        """Send a command to all workers and wait until they are done."""
+        for _, connection in self.workers:
+            connection.send(command)
+        for _, connection in self.workers:
+            connection.recv()
+
+
+def _memory_layout(env_count, observation_shape, observation_dtype):
+    """Return the dtype, shape and byte offset of every array in shared memory.
+
+    The arrays are actions, rewards, dones and observations, each starting
+    at a multiple of its dtype's alignment. Also return the bytes they take.
+    """
+    arrays = (
+        (np.dtype(np.int64), (env_count,)),
+        (np.dtype(np.float32), (env_count,)),
+        (np.dtype(bool), (env_count,)),
+        (np.dtype(observation_dtype), (env_count, *observation_shape)),
+    )
+
+    layout = []
+    offset = 0
+    for dtype, shape in arrays:
+        offset = -(-offset // dtype.alignment) * dtype.alignment
+        layout.append((dtype, shape, offset))
+        offset += dtype.itemsize * int(np.prod(shape))
+
+    return layout, offset
+
+
+def _memory_size(env_count, observation_shape, observation_dtype):
+    """Return the bytes of shared memory for env_count environments."""
+    return _memory_layout(env_count, observation_shape, observation_dtype)[1]
+
+
+def _memory_arrays(memory, env_count, observation_shape, observation_dtype):
+    """Return actions, rewards, dones and observations in shared memory."""
+    layout, _ = _memory_layout(env_count, observation_shape, observation_dtype)
+    return tuple(
+        np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+        for dtype, shape, offset in layout
+    )
+
+
+def _give_seeds(envs, start, env_count, seed):
+    """Give every environment, which begin at index start, its own seeds."""
+    for index, env in enumerate(envs, start):
+        env.seeds = itertools.count(seed + index, env_count)
+
+
+def _reset_envs(envs, start, observations):
+    """Reset the environments, which begin at index start, with new seeds."""
+    for index, env in enumerate(envs, start):
+        env.reset(next(env.seeds))
+        env.get_observation(observations[index])
+
+
+def _step_envs(envs, start, actions, observations, rewards, dones):
+    """Step the environments, which begin at index start."""
+    for index, env in enumerate(envs, start):
+        _, reward, done, _ = env.step(actions[index])
+        rewards[index] = reward
+        dones[index] = done
+
+        if done:
+            # Start the next game with the environment's next seed.
+            env.reset(next(env.seeds))
+
+        env.get_observation(observations[index])
+
+
+def _run_worker(connection, memory_name, layout, start, stop, env_options, seed):
+    """Step the environments from start to stop on commands from connection."""
+    memory = SharedMemory(name=memory_name)
+    actions, rewards, dones, observations = _memory_arrays(memory, *layout)
+    envs = [AlienInvasionEnv(*env_options) for _ in range(start, stop)]
+    _give_seeds(envs, start, layout[0], seed)
+
+    while True:
+        command, _ = connection.recv()
+
+        if command == "reset":
+            _reset_envs(envs, start, observations)
+        elif command == "step":
+            _step_envs(envs, start, actions, observations, rewards, dones)
+        else:
+            break
+
+        connection.send(None)
+
+    del actions, rewards, dones, observations
+    memory.close()
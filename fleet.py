@@ -0,0 +1,432 @@
+"""A fleet of aliens for Alien Invasion."""
+import numpy as np
+import pygame
+
+import assets
+from consts import alien_image_file
+from spatial_grid import SpatialGrid
+
+
+class Fleet:
+    """A class to work with the whole fleet of aliens at once.
+
+    Positions and alive flags are kept in NumPy arrays, so moving the fleet
+    and checking its edges cost a few vectorized operations per frame
+    instead of a Python loop over every alien. A spatial grid limits
+    collision checks to the aliens near a rect.
+
+    The fleet moves as a whole, so aliens that share a column or a row
+    keep sharing it. An index of the lowest alien of every column, the
+    rightmost alien of every row and the columns and rows that still have
+    aliens is updated as aliens die, so the bounds of the fleet and its
+    lowest alien are found without looking at every alien.
+
+    For the same reason the whole fleet can be drawn with one blit of a
+    layer all living aliens are drawn on. The layer is drawn again when
+    aliens are added; aliens that die are only erased from a copy of it.
+    """
+
+    def __init__(self, game):
+        """Initialize an empty fleet."""
+        self.playfield = game.playfield
+        self.screen = game.screen
+        self.settings = game.settings
+
+        # Every alien shares the same cached image.
+        self.image = assets.get_image(alien_image_file)
+        self.width, self.height = self.image.get_size()
+
+        # Cells are as big as the space an alien takes in the fleet.
+        self.grid = SpatialGrid(
+            2 * self.width, 2 * self.height, self.width, self.height
+        )
+
+        # The fleet drawn on one surface, and the aliens killed since.
+        self.layer = None
+        self.layer_killed = []
+
+        self.empty()
+
+    def __len__(self):
+        """Return the number of aliens that are still alive."""
+        return self.count
+
+    def empty(self):
+        """Remove all aliens from the fleet."""
+        # Decimal x positions, rounded x positions as used by rects, y positions.
+        self.x = np.empty(0, dtype=np.float64)
+        self.rect_x = np.empty(0, dtype=np.int64)
+        self.y = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.count = 0
+        self.layer = None
+
+        # Positions at the previous simulation step, used for drawing.
+        self.previous_x = self.x.copy()
+        self.previous_y = self.y.copy()
+
+        self.grid.build(self.x, self.y)
+        self._build_index()
+
+    def add(self, x, y):
+        """Add aliens with top left corners at the given positions."""
+        x = np.asarray(x, dtype=np.float64)
+        self.x = np.concatenate((self.x, x))
+        self.rect_x = np.concatenate((self.rect_x, _round(x)))
+        self.y = np.concatenate((self.y, np.asarray(y, dtype=np.int64)))
+        self.alive = np.concatenate((self.alive, np.ones(len(x), dtype=bool)))
+        self.count += len(x)
+        self.layer = None
+
+        # New aliens appear in place, they don't move in from anywhere.
+        self.store_positions()
+
+        self.grid.build(self.x, self.y)
+        self.grid.remove(np.flatnonzero(~self.alive))
+        self._build_index()
+
+    def store_positions(self):
+        """Remember the current positions as the previous ones."""
+        if len(self.previous_x) == len(self.x):
+            np.copyto(self.previous_x, self.x)
+            np.copyto(self.previous_y, self.y)
+        else:
+            self.previous_x = self.x.copy()
+            self.previous_y = self.y.copy()
+
+    def update(self):
+        """Move the fleet right or left."""
+        dx = self.settings.alien_speed_factor * self.settings.fleet_direction
+        self.x += dx
+        self.rect_x = _round(self.x)
+        self.grid.move(dx, 0)
+
+    def check_edges(self):
+        """Return True if any alien is at the edge of the playfield."""
+        if not self.count:
+            return False
+
+        bounds = self.get_bounds()
+        return bounds.right >= self.playfield.right or bounds.left <= 0
+
+    def change_direction(self):
+        """Drop the fleet and reverse the direction."""
+        self.y += self.settings.fleet_drop_speed
+        self.grid.move(0, self.settings.fleet_drop_speed)
+        self.settings.fleet_direction *= -1
+
+    def check_bottom(self, bottom):
+        """Return True if any alien has reached the given bottom line."""
+        if not self.count:
+            return False
+
+        return self.get_bounds().bottom >= bottom
+
+    def collide(self, rect, dokill=False):
+        """Return indices of the living aliens that collide with rect."""
+        # Only test the aliens in the grid cells around the rect.
+        candidates = self.grid.query(rect)
+        if not len(candidates):
+            return candidates
+
+        left, top, width, height = rect
+        rect_x = self.rect_x[candidates]
+        y = self.y[candidates]
+        hits = np.sort(
+            candidates[
+                self.alive[candidates]
+                & (rect_x < left + width)
+                & (rect_x + self.width > left)
+                & (y < top + height)
+                & (y + self.height > top)
+            ]
+        )
+
+        if dokill and len(hits):
+            self.kill(hits)
+
+        return hits
+
+    def collideany(self, rect):
+        """Return True if any living alien collides with rect."""
+        return len(self.collide(rect)) > 0
+
+    def groupcollide(self, group, dokill):
+        """Find collisions between the sprites of a group and the fleet.
+
+        Work as pygame.sprite.groupcollide(group, fleet, dokill, True) and
+        return a dictionary of sprites mapped to the indices of aliens they hit.
+        Sprites are removed from the group with group.remove().
+        """
+        collisions = {}
+
+        for sprite in group.sprites():
+            hits = self.collide(sprite.rect, dokill=True)
+            if len(hits):
+                collisions[sprite] = hits
+
+        if dokill and collisions:
+            group.remove(*collisions)
+
+        return collisions
+
+    def kill(self, indices):
+        """Destroy the living aliens with the given indices."""
+        self.alive[indices] = False
+        self.count -= len(indices)
+        self.grid.remove(indices)
+
+        indices = np.asarray(indices).tolist()
+        for index in indices:
+            self._remove_from_index(index)
+
+        if self.layer is not None:
+            self.layer_killed.extend(indices)
+
+    def get_rect(self, index):
+        """Return a rect of the alien with the given index."""
+        return pygame.Rect(
+            int(self.rect_x[index]), int(self.y[index]), self.width, self.height
+        )
+
+    def get_lowest_alien(self):
+        """Return the index of the lowest alien, the rightmost one on ties."""
+        return self.row_rightmost[self.last_row]
+
+    def get_column_lowest(self, column):
+        """Return the index of the lowest alien of a column, or -1 if it has none."""
+        return self.column_lowest[column]
+
+    def get_bounds(self):
+        """Return the rect that bounds all living aliens of a nonempty fleet."""
+        left = int(self.rect_x[self.column_lowest[self.first_column]])
+        right = int(self.rect_x[self.column_lowest[self.last_column]]) + self.width
+        top = int(self.y[self.row_rightmost[self.first_row]])
+        bottom = int(self.y[self.row_rightmost[self.last_row]]) + self.height
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def find_column(self, x):
+        """Return the column with living aliens that covers x, or -1 if none does."""
+        if not self.count:
+            return -1
+
+        # How far the fleet has moved since the columns were found.
+        alien = self.row_rightmost[self.last_row]
+        x -= self.x[alien] - self.column_x[self.column[alien]]
+
+        column = int(np.searchsorted(self.column_x, x, side="right")) - 1
+        if column < 0 or x >= self.column_x[column] + self.width:
+            return -1
+        if not self.column_counts[column]:
+            return -1
+        return column
+
+    def get_blits(self, surface_rect, alpha=1.0, camera=(0, 0)):
+        """Return the blits that draw the living aliens on a surface of surface_rect.
+
+        Place them alpha of the way from their previous positions to the
+        current ones, with the playfield position camera at the top left of
+        the surface. Return a list of (image, position) pairs and the rect
+        that bounds them, or None if there are none.
+        """
+        if not self.count:
+            return [], None
+
+        layer = self._get_layer()
+        if layer is not None:
+            return self._get_layer_blits(layer, surface_rect, alpha, camera)
+
+        if alpha == 1.0:
+            rect_x = self.rect_x[self.alive]
+            y = self.y[self.alive]
+        else:
+            alive = self.alive
+            x = self.x[alive] * alpha + self.previous_x[alive] * (1 - alpha)
+            y = self.y[alive] * alpha + self.previous_y[alive] * (1 - alpha)
+            rect_x, y = _round(x), _round(y)
+
+        if camera != (0, 0):
+            rect_x = rect_x - camera[0]
+            y = y - camera[1]
+
+        # Skip the aliens off the surface, a large playfield has many.
+        bounds = self.get_bounds()
+        if not surface_rect.contains(bounds.move(-camera[0], -camera[1])):
+            visible = (
+                (rect_x > -self.width)
+                & (rect_x < surface_rect.width)
+                & (y > -self.height)
+                & (y < surface_rect.height)
+            )
+            if not visible.any():
+                return [], None
+            rect_x, y = rect_x[visible], y[visible]
+
+        image = self.image
+        blits = [(image, position) for position in zip(rect_x.tolist(), y.tolist())]
+
+        left, top = int(rect_x.min()), int(y.min())
+        bounds = pygame.Rect(
+            left,
+            top,
+            int(rect_x.max()) + self.width - left,
+            int(y.max()) + self.height - top,
+        ).clip(surface_rect)
+        return blits, bounds
+
+    def _get_layer_blits(self, layer, surface_rect, alpha, camera):
+        """Return the blit of the layer that draws the fleet, and its bounds."""
+        image, anchor, offset_x, offset_y = layer
+
+        # The fleet moves as a whole, so the layer moves with any one alien.
+        if alpha == 1.0:
+            x, y = int(self.rect_x[anchor]), int(self.y[anchor])
+        else:
+            x = _round(self.x[anchor] * alpha + self.previous_x[anchor] * (1 - alpha))
+            y = _round(self.y[anchor] * alpha + self.previous_y[anchor] * (1 - alpha))
+            x, y = int(x), int(y)
+
+        position = (x - offset_x - camera[0], y - offset_y - camera[1])
+        bounds = image.get_rect(topleft=position).clip(surface_rect)
+        if not bounds:
+            return [], None
+        return [(image, position)], bounds
+
+    def _get_layer(self):
+        """Return the fleet drawn on a layer, or None if it is too large.
+
+        A layer is an (image, anchor, offset_x, offset_y) tuple: the image
+        is drawn at the position of the alien with the anchor index, less
+        the offsets. The image of a layer is never drawn on once returned,
+        so it can be drawn on another thread; erasing aliens makes a copy.
+        """
+        if self.layer is None:
+            self.layer = self._make_layer()
+        elif self.layer_killed:
+            self.layer = self._erase_killed(self.layer, self.layer_killed)
+        self.layer_killed = []
+
+        return self.layer
+
+    def _make_layer(self):
+        """Draw the living aliens on a new layer, or return None if too large.
+
+        The background color of the alien image is see-through on the layer,
+        so unlike aliens blitted one by one, the layer doesn't cover bullets
+        behind an alien's background.
+        """
+        bounds = self.get_bounds()
+        if bounds.width * bounds.height > self.settings.fleet_layer_pixels:
+            return None
+
+        # The layer has the format of the screen to blit to it quickly.
+        bg_color = self.settings.bg_color
+        image = pygame.Surface(bounds.size, 0, self.screen)
+        image.fill(bg_color)
+        image.set_colorkey(bg_color, pygame.RLEACCEL)
+
+        rect_x = (self.rect_x[self.alive] - bounds.left).tolist()
+        y = (self.y[self.alive] - bounds.top).tolist()
+        alien = self.image
+        image.blits([(alien, position) for position in zip(rect_x, y)], False)
+
+        # Dead aliens keep moving with the fleet, so any alien is an anchor.
+        anchor = self.get_lowest_alien()
+        offset_x = int(self.rect_x[anchor]) - bounds.left
+        offset_y = int(self.y[anchor]) - bounds.top
+        return image, anchor, offset_x, offset_y
+
+    def _erase_killed(self, layer, killed):
+        """Return a copy of the layer without the killed aliens."""
+        image, anchor, offset_x, offset_y = layer
+        image = image.copy()
+
+        # Playfield positions less these are positions on the layer.
+        left = int(self.rect_x[anchor]) - offset_x
+        top = int(self.y[anchor]) - offset_y
+
+        bg_color = self.settings.bg_color
+        for index in killed:
+            rect = self.get_rect(index)
+            image.fill(bg_color, rect.move(-left, -top))
+
+            # Draw the living aliens that overlap the erased rect again.
+            for neighbor in self.collide(rect).tolist():
+                position = (
+                    int(self.rect_x[neighbor]) - left,
+                    int(self.y[neighbor]) - top,
+                )
+                image.blit(self.image, position)
+
+        return image, anchor, offset_x, offset_y
+
+    def _build_index(self):
+        """Sort the aliens into columns and rows and index the living ones."""
+        alive = self.alive
+        self.column_x, column = np.unique(self.x, return_inverse=True)
+        self.row_y, row = np.unique(self.y, return_inverse=True)
+        self.column, self.row = column.tolist(), row.tolist()
+
+        column_counts = np.bincount(column[alive], minlength=len(self.column_x))
+        row_counts = np.bincount(row[alive], minlength=len(self.row_y))
+        self.column_counts = column_counts.tolist()
+        self.row_counts = row_counts.tolist()
+
+        # Living aliens of every column from top to bottom, and of every row
+        # from left to right, the lowest index last on ties.
+        indices = np.flatnonzero(alive)
+        by_column = indices[np.lexsort((-indices, row[indices], column[indices]))]
+        by_row = indices[np.lexsort((-indices, column[indices], row[indices]))]
+        self.column_members = _split(by_column, column_counts)
+        self.row_members = _split(by_row, row_counts)
+
+        self.column_lowest = [self._last_alive(m) for m in self.column_members]
+        self.row_rightmost = [self._last_alive(m) for m in self.row_members]
+
+        self.first_column, self.last_column = 0, len(self.column_counts) - 1
+        self.first_row, self.last_row = 0, len(self.row_counts) - 1
+        self._shrink_bounds()
+
+    def _remove_from_index(self, index):
+        """Update the index after the alien with the given index died."""
+        column, row = self.column[index], self.row[index]
+
+        self.column_counts[column] -= 1
+        if self.column_lowest[column] == index:
+            self.column_lowest[column] = self._last_alive(self.column_members[column])
+
+        self.row_counts[row] -= 1
+        if self.row_rightmost[row] == index:
+            self.row_rightmost[row] = self._last_alive(self.row_members[row])
+
+        self._shrink_bounds()
+
+    def _shrink_bounds(self):
+        """Move the first and last columns and rows past the empty ones."""
+        columns, rows = self.column_counts, self.row_counts
+
+        while self.first_column < self.last_column and not columns[self.first_column]:
+            self.first_column += 1
+        while self.last_column > self.first_column and not columns[self.last_column]:
+            self.last_column -= 1
+        while self.first_row < self.last_row and not rows[self.first_row]:
+            self.first_row += 1
+        while self.last_row > self.first_row and not rows[self.last_row]:
+            self.last_row -= 1
+
+    def _last_alive(self, members):
+        """Return the last of the given aliens that is alive, or -1."""
+        alive = members[self.alive[members]]
+        return int(alive[-1]) if len(alive) else -1
+
+
+def _split(indices, counts):
+    """Split indices into consecutive groups of the given sizes."""
+    if not len(counts):
+        return []
+    return np.split(indices, np.cumsum(counts)[:-1])
+
+
+def _round(x):
+    """Round positions half away from zero, the same way pygame rects do."""
+    return np.trunc(x + np.copysign(0.5, x)).astype(np.int64)
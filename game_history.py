@@ -0,0 +1,166 @@
+"""A local store of all finished Alien Invasion games."""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from consts import game_stats_file
+
+_schema = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    ships_lost INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    steps INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_by_day ON games (day, score DESC);
+"""
+
+_insert = """
+INSERT INTO games (played_at, day, player, score, level, ships_lost, duration, steps)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# The high score of game_stats.json is kept as a game of this player.
+_imported_player = "imported"
+
+_import = """
+INSERT INTO games (played_at, day, player, score, level, ships_lost, duration, steps)
+SELECT ?, ?, ?, ?, 0, 0, 0, 0
+WHERE NOT EXISTS (SELECT 1 FROM games WHERE player = ?)
+"""
+
+
+class GameHistory:
+    """Record finished games in an SQLite database.
+
+    Games are written by a background thread, so recording a game never
+    makes the game loop wait for the disk. Several processes may share the
+    same database.
+    """
+
+    def __init__(self, file_name, stats_file=game_stats_file):
+        """Open the database, creating it if needed.
+
+        The high score of stats_file, the file older versions kept it in,
+        is imported the first time the database is opened after it appears.
+        """
+        self.file_name = file_name
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_schema)
+
+        if stats_file and os.path.exists(stats_file):
+            self._import_high_score(stats_file)
+
+        self.games = queue.Queue()
+        self.writer = threading.Thread(target=self._write_games, daemon=True)
+        self.writer.start()
+
+    def record_game(self, player, score, level, ships_lost, duration, steps):
+        """Queue a finished game to be written."""
+        played_at = time.time()
+        day = time.strftime("%Y-%m-%d", time.localtime(played_at))
+        self.games.put(
+            (played_at, day, player, score, level, ships_lost, duration, steps)
+        )
+
+    def get_high_score(self):
+        """Return the best score of all recorded games."""
+        with closing(self._connect()) as connection, connection:
+            (high_score,) = connection.execute(
+                "SELECT MAX(score) FROM games"
+            ).fetchone()
+
+        return high_score or 0
+
+    def get_top_games(self, count=10, day=None, player=None):
+        """Return the count best games, of one day and player if given.
+
+        Every game is a tuple of the time it ended, player, score, level,
+        ships lost, duration in seconds and simulation steps.
+        """
+        query = (
+            "SELECT played_at, player, score, level, ships_lost, duration, steps"
+            " FROM games"
+        )
+        conditions, parameters = [], []
+        if day is not None:
+            conditions.append("day = ?")
+            parameters.append(day)
+        if player is not None:
+            conditions.append("player = ?")
+            parameters.append(player)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY score DESC LIMIT ?"
+        parameters.append(count)
+
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(query, parameters).fetchall()
+
+    def get_daily_summary(self, days=7):
+        """Return the number of games and the best score of the last days."""
+        with closing(self._connect()) as connection, connection:
+            return connection.execute(
+                "SELECT day, COUNT(*), MAX(score) FROM games"
+                " WHERE day >= date('now', 'localtime', ?)"
+                " GROUP BY day ORDER BY day",
+                (f"-{days - 1} days",),
+            ).fetchall()
+
+    def close(self):
+        """Write the queued games and stop the writer."""
+        if self.writer.is_alive():
+            self.games.put(None)
+            self.writer.join()
+
+    def _import_high_score(self, stats_file):
+        """Record the high score of stats_file as a game, unless it already is."""
+        try:
+            with open(stats_file) as file:
+                high_score = int(json.load(file))
+        except (OSError, ValueError, TypeError):
+            return
+
+        played_at = os.path.getmtime(stats_file)
+        day = time.strftime("%Y-%m-%d", time.localtime(played_at))
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                _import,
+                (played_at, day, _imported_player, high_score, _imported_player),
+            )
+
+    def _connect(self):
+        """Open a connection that waits for other writers."""
+        return sqlite3.connect(self.file_name, timeout=30)
+
+    def _write_games(self):
+        """Write queued games until None is queued."""
+        connection = self._connect()
+        done = False
+
+        while not done:
+            # Write all games queued by now in one transaction.
+            games = [self.games.get()]
+            while not self.games.empty():
+                games.append(self.games.get())
+
+            if None in games:
+                games = games[: games.index(None)]
+                done = True
+
+            with connection:
+                connection.executemany(_insert, games)
+
+        connection.close()
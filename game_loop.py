@@ -0,0 +1,213 @@
+"""The main loop for Alien Invasion."""
+import queue
+import threading
+
+import pygame
+
+import profiler
+from render import FrameBuffer
+
+
+class GameLoop:
+    """A main loop that steps the game at a fixed rate and draws separately.
+
+    The simulation always advances in steps of the same length, so the game
+    runs at the same speed on every machine. Drawing happens at most
+    target_fps times per second and interpolates between the last two steps.
+
+    With the render_thread setting, a simulation thread steps the game and
+    publishes a draw list per frame, and the main thread draws them.
+    """
+
+    def __init__(self, game, step):
+        """Initialize the loop for the game and a function making one step."""
+        self.game = game
+        self.settings = game.settings
+        self.step = step
+
+    def run(self, max_frames=None):
+        """Run the loop, stop after max_frames simulation steps if given."""
+        self.game.frames = 0
+
+        try:
+            if self.game.headless:
+                self._run_headless(max_frames)
+            elif self.settings.render_thread:
+                self._run_threaded(max_frames)
+            else:
+                self._run_windowed(max_frames)
+        finally:
+            if self.game.profiler:
+                self.game.profiler.dump(self.settings.profile_file)
+            if self.game.recorder:
+                self.game.recorder.close(self.game)
+            if self.game.history:
+                self.game.history.close()
+            if self.game.metrics_server:
+                self.game.metrics_server.close()
+
+    def _run_headless(self, max_frames):
+        """Step the game as fast as possible until the game is over."""
+        game = self.game
+        prof = game.profiler
+        metrics = game.metrics
+
+        while self._has_frames_left(max_frames):
+            if not game.stats.game_active:
+                break
+
+            if prof:
+                prof.start_frame()
+
+            self.step()
+            game.frames += 1
+
+            if prof:
+                prof.end_frame()
+            if metrics:
+                metrics.end_frame()
+
+    def _run_windowed(self, max_frames):
+        """Step the game in real time and draw it."""
+        game = self.game
+        prof = game.profiler
+        metrics = game.metrics
+        clock = pygame.time.Clock()
+
+        # Length of a step and the time not simulated yet, in milliseconds.
+        step_time = 1000 / self.settings.steps_per_second
+        lag = 0.0
+
+        while self._has_frames_left(max_frames):
+            # Wait to keep the frame rate and catch up with the elapsed time.
+            lag += clock.tick(self.settings.target_fps)
+
+            if prof:
+                prof.start_frame()
+
+            game._check_events()
+            if prof:
+                prof.lap(profiler.EVENTS)
+
+            lag = self._catch_up(lag, step_time, max_frames)
+
+            # Draw the game between the last two steps.
+            if prof:
+                prof.lap(profiler.OTHER)
+
+            game._update_screen(lag / step_time)
+
+            if prof:
+                prof.lap(profiler.SCREEN)
+                prof.end_frame()
+            if metrics:
+                metrics.end_frame()
+
+    def _run_threaded(self, max_frames):
+        """Step the game on a simulation thread and draw it on this one.
+
+        pygame wants its events and its window handled on the main thread,
+        so this thread reads the events and draws the newest draw list. It
+        passes input on to the simulation thread, which applies it at the
+        start of its next frame, so the game plays the same however fast
+        the frames are drawn.
+        """
+        game = self.game
+        frames = FrameBuffer()
+        self.inputs = queue.SimpleQueue()
+        self.stopping = threading.Event()
+        self.error = None
+
+        simulation = threading.Thread(
+            target=self._simulate, args=(max_frames, frames), name="simulation"
+        )
+        simulation.start()
+
+        quitting = False
+        try:
+            while simulation.is_alive() and not quitting:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key == pygame.K_q
+                    ):
+                        quitting = True
+                    elif event.type == pygame.WINDOWEXPOSED:
+                        # Parts of the window may be lost, redraw all of it.
+                        game.dirty_rects = None
+                    else:
+                        self.inputs.put(event)
+
+                # Wake up now and then to keep reading events.
+                draw_list = frames.take(timeout=0.1)
+                if draw_list is not None:
+                    game._present(draw_list)
+        finally:
+            self.stopping.set()
+            simulation.join()
+
+        if self.error:
+            raise self.error
+        if quitting:
+            game._quit()
+
+    def _simulate(self, max_frames, frames):
+        """Step the game in real time and publish a draw list per frame."""
+        game = self.game
+        prof = game.profiler
+        metrics = game.metrics
+        clock = pygame.time.Clock()
+
+        step_time = 1000 / self.settings.steps_per_second
+        lag = 0.0
+
+        try:
+            while not self.stopping.is_set() and self._has_frames_left(max_frames):
+                lag += clock.tick(self.settings.target_fps)
+
+                if prof:
+                    prof.start_frame()
+
+                # Apply the input that came in since the last frame.
+                while not self.inputs.empty():
+                    game._check_event(self.inputs.get())
+                if prof:
+                    prof.lap(profiler.EVENTS)
+
+                lag = self._catch_up(lag, step_time, max_frames)
+                if prof:
+                    prof.lap(profiler.OTHER)
+
+                # Hand the frame between the last two steps to the main thread.
+                frames.publish(game._get_draw_list(lag / step_time))
+
+                if prof:
+                    prof.lap(profiler.SCREEN)
+                    prof.end_frame()
+                if metrics:
+                    metrics.end_frame()
+        except BaseException as error:
+            self.error = error
+        finally:
+            frames.close()
+
+    def _catch_up(self, lag, step_time, max_frames):
+        """Make the steps lag milliseconds hold and return the time left over."""
+        game = self.game
+        steps = 0
+
+        while lag >= step_time and self._has_frames_left(max_frames):
+            self.step()
+            game.frames += 1
+            lag -= step_time
+
+            steps += 1
+            if steps == self.settings.max_steps_per_frame:
+                # Slow the game down rather than fall further behind.
+                lag %= step_time
+                break
+
+        return lag
+
+    def _has_frames_left(self, max_frames):
+        """Return True if the loop may make another simulation step."""
+        return max_frames is None or self.game.frames < max_frames
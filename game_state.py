@@ -0,0 +1,264 @@
+"""A compact copy of the game state that can be simulated without pygame."""
+from bisect import bisect_left, bisect_right
+
+# Actions: which way to move and whether to fire.
+NOOP, LEFT, RIGHT, FIRE, LEFT_FIRE, RIGHT_FIRE = range(6)
+action_count = 6
+moves = {
+    NOOP: (False, False, False),
+    LEFT: (True, False, False),
+    RIGHT: (False, True, False),
+    FIRE: (False, False, True),
+    LEFT_FIRE: (True, False, True),
+    RIGHT_FIRE: (False, True, True),
+}
+
+
+class Layout:
+    """Everything about a game that stays the same while its fleet lives.
+
+    The fleet moves as a whole, so aliens are kept on a lattice of columns
+    and rows, and the fleet's position is an offset added to all of them.
+    A layout is shared by all states copied from the same fleet.
+    """
+
+    def __init__(self, game):
+        """Read the layout of the game's current fleet."""
+        fleet = game.aliens
+        settings = game.settings
+
+        # The fleet's positions at the time the layout was read.
+        self.source = fleet.x
+
+        # Alien positions relative to the fleet, and which alien is where.
+        self.column_x = fleet.column_x.tolist()
+        self.row_y = fleet.row_y.tolist()
+        self.column = fleet.column
+        self.row = fleet.row
+        self.cells = {
+            (fleet.column[index], fleet.row[index]): index
+            for index in range(len(fleet.column))
+            if fleet.alive[index]
+        }
+        self.alien_width, self.alien_height = fleet.width, fleet.height
+
+        self.playfield_width, self.playfield_height = game.playfield.size
+        self.ship_width, self.ship_height = game.ship.rect.size
+        self.ship_top = game.playfield.height - self.ship_height
+        self.bullet_width = settings.bullet_width
+        self.bullet_height = settings.bullet_height
+        # Bullets are fired from the middle of the ship's top.
+        self.bullet_dx = self.ship_width // 2 - self.bullet_width // 2
+        self.bullets_allowed = settings.bullets_allowed
+        self.fleet_drop_speed = settings.fleet_drop_speed
+
+    def matches(self, game):
+        """Return True if the layout still belongs to the game's fleet."""
+        return game.aliens.x is self.source
+
+
+class GameState:
+    """The part of a game that changes while its fleet lives.
+
+    Copying a state takes microseconds, and step() advances it the way the
+    game advances in one simulation step. A state stops when the ship is
+    hit or the fleet is destroyed; it does not go on to the next fleet.
+    """
+
+    __slots__ = (
+        "layout",
+        "ship_x",
+        "fleet_x",
+        "fleet_y",
+        "direction",
+        "alive",
+        "count",
+        "column_counts",
+        "row_counts",
+        "first_column",
+        "last_column",
+        "first_row",
+        "last_row",
+        "bullets",
+        "score",
+        "alien_points",
+        "ship_speed",
+        "bullet_speed",
+        "alien_speed",
+        "hit",
+        "cleared",
+    )
+
+    @classmethod
+    def from_game(cls, game, layout):
+        """Copy the state of a game, whose fleet has the given layout."""
+        fleet = game.aliens
+        settings = game.settings
+        state = cls()
+        state.layout = layout
+
+        state.ship_x = game.ship.x
+        state.bullets = tuple(
+            (bullet.rect.x, bullet.y) for bullet in game.bullets.sprites()
+        )
+
+        # How far the fleet has moved since its layout was read.
+        alien = fleet.get_lowest_alien() if fleet.count else 0
+        state.fleet_x = float(fleet.x[alien]) - layout.column_x[fleet.column[alien]]
+        state.fleet_y = int(fleet.y[alien]) - layout.row_y[fleet.row[alien]]
+        state.direction = settings.fleet_direction
+
+        state.alive = bytearray(fleet.alive.tobytes())
+        state.count = fleet.count
+        state.column_counts = list(fleet.column_counts)
+        state.row_counts = list(fleet.row_counts)
+        state.first_column, state.last_column = fleet.first_column, fleet.last_column
+        state.first_row, state.last_row = fleet.first_row, fleet.last_row
+
+        state.score = game.stats.score
+        state.alien_points = settings.alien_points
+        state.ship_speed = settings.ship_speed_factor
+        state.bullet_speed = settings.bullet_speed_factor
+        state.alien_speed = settings.alien_speed_factor
+
+        state.hit = False
+        state.cleared = not fleet.count
+        return state
+
+    def copy(self):
+        """Return a copy of the state that can be stepped on its own."""
+        state = GameState()
+        for name in GameState.__slots__:
+            setattr(state, name, getattr(self, name))
+
+        # Only these are changed in place, everything else is replaced.
+        state.alive = bytearray(self.alive)
+        state.column_counts = self.column_counts.copy()
+        state.row_counts = self.row_counts.copy()
+        return state
+
+    def step(self, action, steps=1):
+        """Advance the state by one simulation step, playing the action.
+
+        With steps above 1, advance by that many steps at once: everything
+        moves as far as it would in those steps but collisions and edges
+        are only checked once, and at most one bullet is fired. Bullets
+        still can't fly past aliens if steps is small enough.
+        """
+        if self.hit or self.cleared:
+            return
+
+        layout = self.layout
+        moving_left, moving_right, fire = moves[action]
+
+        if fire and len(self.bullets) < layout.bullets_allowed:
+            self.bullets += ((self.ship_x + layout.bullet_dx, layout.ship_top),)
+
+        # Move the ship within the playfield.
+        if moving_left and self.ship_x > 0:
+            self.ship_x -= self.ship_speed * steps
+        if moving_right and self.ship_x + layout.ship_width < layout.playfield_width:
+            self.ship_x += self.ship_speed * steps
+
+        if self.bullets:
+            self._update_bullets(self.bullet_speed * steps)
+            if self.cleared:
+                return
+
+        # Drop the fleet and turn at the edges, then move it.
+        left = layout.column_x[self.first_column] + self.fleet_x
+        right = layout.column_x[self.last_column] + self.fleet_x + layout.alien_width
+        if right >= layout.playfield_width or left <= 0:
+            self.fleet_y += layout.fleet_drop_speed
+            self.direction = -self.direction
+        self.fleet_x += self.alien_speed * self.direction * steps
+
+        # The ship is lost if the fleet reaches it or the bottom.
+        bottom = layout.row_y[self.last_row] + self.fleet_y + layout.alien_height
+        if bottom > layout.ship_top:
+            self.hit = bottom >= layout.playfield_height or self._collide(
+                self.ship_x, layout.ship_top, layout.ship_width, layout.ship_height
+            )
+
+    def get_lowest_alien_x(self):
+        """Return the x position of the lowest alien, the rightmost on ties."""
+        layout = self.layout
+        cells, alive = layout.cells, self.alive
+
+        for column in range(self.last_column, self.first_column - 1, -1):
+            index = cells.get((column, self.last_row))
+            if index is not None and alive[index]:
+                return layout.column_x[column] + self.fleet_x
+
+        return layout.column_x[self.first_column] + self.fleet_x
+
+    def _update_bullets(self, distance):
+        """Move the bullets up by distance and let them destroy the aliens they hit."""
+        layout = self.layout
+        width, height = layout.bullet_width, layout.bullet_height
+        bullets = []
+
+        for x, y in self.bullets:
+            y -= distance
+            if int(y) + height <= 0:
+                continue
+
+            hits = self._collide(x, y, width, height, kill=True)
+            if hits:
+                self.score += hits * self.alien_points
+            else:
+                bullets.append((x, y))
+
+        self.bullets = tuple(bullets)
+
+    def _collide(self, x, y, width, height, kill=False):
+        """Return the number of living aliens a rect collides with.
+
+        Destroy them if kill is True.
+        """
+        layout = self.layout
+        cells, alive = layout.cells, self.alive
+
+        # The columns and rows that overlap the rect, relative to the fleet.
+        x -= self.fleet_x
+        y -= self.fleet_y
+        first_column = bisect_right(layout.column_x, x - layout.alien_width)
+        last_column = bisect_left(layout.column_x, x + width)
+        first_row = bisect_right(layout.row_y, y - layout.alien_height)
+        last_row = bisect_left(layout.row_y, y + height)
+
+        hits = 0
+        for column in range(first_column, last_column):
+            for row in range(first_row, last_row):
+                index = cells.get((column, row))
+                if index is None or not alive[index]:
+                    continue
+
+                hits += 1
+                if kill:
+                    self._kill(index)
+
+        return hits
+
+    def _kill(self, index):
+        """Destroy the alien with the given index."""
+        layout = self.layout
+        self.alive[index] = 0
+        self.count -= 1
+        self.column_counts[layout.column[index]] -= 1
+        self.row_counts[layout.row[index]] -= 1
+
+        if not self.count:
+            self.cleared = True
+            return
+
+        # Move the bounds of the fleet past emptied columns and rows.
+        columns, rows = self.column_counts, self.row_counts
+        while not columns[self.first_column]:
+            self.first_column += 1
+        while not columns[self.last_column]:
+            self.last_column -= 1
+        while not rows[self.first_row]:
+            self.first_row += 1
+        while not rows[self.last_row]:
+            self.last_row -= 1
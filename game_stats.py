@@ -1,7 +1,5 @@
 """A class to store game statistics and reset it."""
-import json
-
-from consts import game_stats_file
+from time import monotonic
 
 
 class GameStats:
@@ -11,22 +9,21 @@ class GameStats:
         """Initialize statistics."""
         self.settings = game.settings
         self.game_active = False
-        high_score = self._retrieve_high_score()
-        self.high_score = high_score
+        self.high_score = 0
+        if game.history:
+            self.high_score = game.history.get_high_score()
 
         self.reset_stats()
 
-    def _retrieve_high_score(self):
-        try:
-            with open(game_stats_file) as file:
-                high_score = json.load(file)
-        except FileNotFoundError:
-            return 0
-        else:
-            return high_score
-
     def reset_stats(self):
         """Reset the stats to default values."""
         self.ships_left = self.settings.ship_limit
         self.score = 0
         self.level = 1
+
+        # When the game started and how many steps it has been played for.
+        self.start_time = monotonic()
+        self.steps = 0
+
+        # Steps left to wait before the game goes on after the ship was hit.
+        self.pause_steps = 0
@@ -0,0 +1,135 @@
+"""Record the input of Alien Invasion games and read the recordings."""
+import json
+import struct
+
+# Magic bytes, version, seed, whether the game was active at the first step,
+# the number of steps the game waits after the ship is hit and the length of
+# the settings profile that follows, as JSON.
+_header = struct.Struct("<4sBQ?II")
+# Number of steps, final score and level.
+_footer = struct.Struct("<IQI")
+_magic = b"AIRP"
+_version = 3
+
+# Bits of the byte written for every step. The upper bits hold the number
+# of actions done since the last step, one byte per action follows.
+MOVING_LEFT = 1
+MOVING_RIGHT = 2
+_action_shift = 2
+_max_actions = 0xFF >> _action_shift
+
+# Actions.
+FIRE = 1
+START = 2
+
+
+class InputRecorder:
+    """Write the input of every simulation step to a binary file.
+
+    A step is written as one byte with the ship's movement flags and the
+    number of actions (fired bullets and started games) since the last step,
+    followed by one byte per action.
+    """
+
+    def __init__(self, file_name, seed):
+        """Open the file to record to."""
+        self.file = open(file_name, "wb")
+        self.seed = seed
+        self.actions = bytearray()
+        self.steps = 0
+
+    def record_action(self, action):
+        """Remember an action to write with the next step."""
+        self.actions.append(action)
+
+    def record_step(self, game):
+        """Write the input for the step the game is about to make."""
+        if not self.steps:
+            self._write_header(game)
+
+        # Keep the latest actions if there are too many for one step.
+        actions = self.actions[-_max_actions:]
+
+        flags = len(actions) << _action_shift
+        if game.ship.moving_left:
+            flags |= MOVING_LEFT
+        if game.ship.moving_right:
+            flags |= MOVING_RIGHT
+
+        self.file.write(bytes((flags,)) + actions)
+        self.actions.clear()
+        self.steps += 1
+
+    def close(self, game):
+        """Write the final score and level and close the file."""
+        if not self.steps:
+            self._write_header(game)
+
+        self.file.write(_footer.pack(self.steps, game.stats.score, game.stats.level))
+        self.file.close()
+
+    def _write_header(self, game):
+        """Write what a replay needs to know before the first step."""
+        pause_steps = round(
+            game.settings.ship_hit_pause * game.settings.steps_per_second
+        )
+        # The profile, with the screen size a fullscreen game picked.
+        settings = game.settings
+        profile = dict(
+            settings.profile,
+            screen_width=settings.screen_width,
+            screen_height=settings.screen_height,
+        )
+        profile = json.dumps(profile).encode()
+
+        self.file.write(
+            _header.pack(
+                _magic,
+                _version,
+                self.seed,
+                game.stats.game_active,
+                pause_steps,
+                len(profile),
+            )
+        )
+        self.file.write(profile)
+
+
+class Recording:
+    """A recorded game read from a file."""
+
+    def __init__(self, file_name):
+        """Read the recording."""
+        with open(file_name, "rb") as file:
+            data = file.read()
+
+        (
+            magic,
+            version,
+            self.seed,
+            self.active,
+            self.pause_steps,
+            profile_size,
+        ) = _header.unpack_from(data)
+        if magic != _magic or version != _version:
+            raise ValueError(f"{file_name} is not a recording of version {_version}")
+
+        # The settings the game was played with.
+        start = _header.size + profile_size
+        self.profile = json.loads(data[_header.size : start])
+
+        self.step_count, self.score, self.level = _footer.unpack_from(
+            data, len(data) - _footer.size
+        )
+        self.data = data[start : len(data) - _footer.size]
+
+    def steps(self):
+        """Yield movement flags and a bytes object of actions for every step."""
+        data = self.data
+        position = 0
+
+        while position < len(data):
+            flags = data[position]
+            end = position + 1 + (flags >> _action_shift)
+            yield flags, data[position + 1 : end]
+            position = end
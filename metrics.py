@@ -0,0 +1,263 @@
+"""Prometheus metrics of running Alien Invasion games."""
+import argparse
+import http.client
+import os
+import socket
+import socketserver
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+
+# Upper bounds of the histogram buckets.
+frame_time_buckets = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066, 0.1)
+# Scores grow with the points per alien every level, so their buckets do too.
+score_buckets = tuple(10**power for power in range(2, 13))
+level_buckets = (1, 2, 3, 4, 5, 7, 10, 15, 20, 50)
+
+content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        """Initialize an empty histogram with buckets up to the given bounds."""
+        self.bounds = bounds
+        # The last bucket holds values above all bounds.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Add a value to its bucket."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get_lines(self, name):
+        """Return the sample lines of the histogram in Prometheus text format."""
+        lines = []
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class GameMetrics:
+    """Counters and histograms of the games played by one process.
+
+    The game updates them with a few attribute changes per frame, and a
+    MetricsServer reads them from its own thread. Reads don't lock, so a
+    scrape may see a frame half counted; the next one catches up.
+    """
+
+    def __init__(self):
+        """Initialize all metrics to zero."""
+        # A frame is one drawn frame in a window and one step in headless mode.
+        self.frames = 0
+        self.frame_times = Histogram(frame_time_buckets)
+        self.last_frame = None
+        # Seconds per frame, averaged over roughly the last 20 frames.
+        self.average_frame_time = 0.0
+
+        self.games = 0
+        self.scores = Histogram(score_buckets)
+        self.levels = Histogram(level_buckets)
+
+        self.bullets_fired = 0
+        self.bullet_hits = 0
+        self.aliens_killed = 0
+
+    def end_frame(self):
+        """Count a frame and time it from the end of the last one."""
+        now = perf_counter()
+        if self.last_frame is not None:
+            frame_time = now - self.last_frame
+            self.frame_times.observe(frame_time)
+            self.average_frame_time += (frame_time - self.average_frame_time) / 20
+
+        self.last_frame = now
+        self.frames += 1
+
+    def end_game(self, score, level):
+        """Count a finished game with its score and level."""
+        self.games += 1
+        self.scores.observe(score)
+        self.levels.observe(level)
+
+    def get_text(self):
+        """Return all metrics in Prometheus text format."""
+        frame_time = self.average_frame_time
+        metrics = [
+            ("frames_total", "counter", "Frames run.", [self.frames]),
+            (
+                "frames_per_second",
+                "gauge",
+                "Frame rate over the last frames.",
+                [1 / frame_time if frame_time else 0.0],
+            ),
+            (
+                "frame_time_seconds",
+                "histogram",
+                "Time between the ends of frames.",
+                self.frame_times,
+            ),
+            ("games_total", "counter", "Games finished.", [self.games]),
+            ("game_score", "histogram", "Scores of finished games.", self.scores),
+            ("game_level", "histogram", "Levels of finished games.", self.levels),
+            ("bullets_fired_total", "counter", "Bullets fired.", [self.bullets_fired]),
+            (
+                "bullet_hits_total",
+                "counter",
+                "Bullets that hit an alien.",
+                [self.bullet_hits],
+            ),
+            (
+                "aliens_killed_total",
+                "counter",
+                "Aliens shot down.",
+                [self.aliens_killed],
+            ),
+        ]
+
+        rss = get_rss()
+        if rss is not None:
+            metrics.append(
+                ("resident_memory_bytes", "gauge", "Resident set size.", [rss])
+            )
+
+        lines = []
+        for name, kind, help_text, values in metrics:
+            name = "alien_invasion_" + name
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                lines.extend(values.get_lines(name))
+            else:
+                lines.append(f"{name} {values[0]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def get_rss():
+    """Return the resident set size of this process in bytes, or None."""
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+    except OSError:
+        return None
+
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Answer every GET with the metrics of the server."""
+
+    def do_GET(self):
+        body = self.server.metrics.get_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes come every few seconds, don't print them.
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """An HTTP server on a Unix socket."""
+
+    daemon_threads = True
+
+
+class MetricsServer:
+    """Serve metrics over HTTP from a background thread.
+
+    The address is a port or host:port to listen on, the host being
+    localhost if left out, or the path of a Unix socket if it contains a
+    slash.
+    """
+
+    def __init__(self, metrics, address):
+        """Start serving the metrics on the address."""
+        self.socket_file = None
+
+        if "/" in address:
+            self.socket_file = address
+            if os.path.exists(address):
+                os.unlink(address)
+            self.server = _UnixHTTPServer(address, _MetricsHandler)
+        else:
+            host, _, port = address.rpartition(":")
+            self.server = ThreadingHTTPServer(
+                (host or "localhost", int(port)), _MetricsHandler
+            )
+            self.server.daemon_threads = True
+
+        self.server.metrics = metrics
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="metrics", daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        """Stop serving and remove the socket file."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+        if self.socket_file and os.path.exists(self.socket_file):
+            os.unlink(self.socket_file)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix socket."""
+
+    def __init__(self, socket_file, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_file = socket_file
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_file)
+
+
+def scrape(address, timeout=5):
+    """Return the metrics text served on the address, as a scraper sees it."""
+    if "/" in address:
+        connection = _UnixHTTPConnection(address, timeout)
+    else:
+        host, _, port = address.rpartition(":")
+        connection = http.client.HTTPConnection(
+            host or "localhost", int(port), timeout=timeout
+        )
+
+    try:
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        if response.status != 200:
+            raise OSError(f"Scrape of {address} failed: {response.status}")
+        return response.read().decode()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print the metrics served by a running game."
+    )
+    parser.add_argument("address", help="port, host:port or Unix socket path")
+    args = parser.parse_args()
+
+    print(scrape(args.address), end="")
@@ -0,0 +1,157 @@
+"""A bot that plans its moves by simulating the future of the game."""
+import argparse
+import random
+from time import perf_counter
+
+from ai_player import AIPlayer
+from alien_invasion import AlienInvasion
+from game_state import GameState, Layout, action_count, moves
+
+
+class PlanningPlayer(AIPlayer):
+    """A bot that picks every move with Monte Carlo rollouts.
+
+    Every interval steps the bot copies the game into a GameState and plays
+    out many random futures of horizon steps from it, each starting with
+    one of the actions. It then plays the action with the best average
+    future for the next interval steps. Planning stops after budget
+    seconds, or after max_rollouts futures if given, which makes games
+    with the same seed play the same.
+    """
+
+    def __init__(
+        self,
+        ai_game,
+        budget=0.004,
+        interval=16,
+        horizon=160,
+        rollout_steps=4,
+        max_rollouts=None,
+    ):
+        """Initialize the bot and how much it plans."""
+        super().__init__(ai_game)
+        self.budget = budget
+        self.interval = interval
+        self.horizon = horizon
+        self.rollout_steps = rollout_steps
+        self.max_rollouts = max_rollouts
+
+        # Random futures come from their own generator, seeded by the game.
+        self.rollout_rng = random.Random(ai_game.rng.random())
+
+        self.layout = None
+        self.action = 0
+        self.steps_left = 0
+
+        # Futures played out over the whole game.
+        self.rollouts = 0
+        self.decisions = 0
+
+    def _implement_strategy(self):
+        # Plan a new move every interval steps, unless the game waits.
+        game = self.ai_game
+        if not self.steps_left and not game.stats.pause_steps:
+            self.action = self._plan()
+            self.steps_left = self.interval
+        if self.steps_left:
+            self.steps_left -= 1
+
+        moving_left, moving_right, fire = moves[self.action]
+        game.ship.moving_left = moving_left
+        game.ship.moving_right = moving_right
+        if fire:
+            game._fire_bullet()
+
+    def _plan(self):
+        # Return the action with the best average of the futures played out.
+        game = self.ai_game
+        if self.layout is None or not self.layout.matches(game):
+            self.layout = Layout(game)
+        root = GameState.from_game(game, self.layout)
+
+        totals = [0.0] * action_count
+        rollouts = 0
+        deadline = perf_counter() + self.budget
+
+        # Play out one future per action at a time, so all get as many.
+        while True:
+            for action in range(action_count):
+                totals[action] += self._rollout(root, action)
+            rollouts += action_count
+
+            if self.max_rollouts is not None:
+                if rollouts >= self.max_rollouts:
+                    break
+            elif perf_counter() >= deadline:
+                break
+
+        self.rollouts += rollouts
+        self.decisions += 1
+        return max(range(action_count), key=totals.__getitem__)
+
+    def _rollout(self, root, action):
+        # Play a random future starting with the action and return its value.
+        state = root.copy()
+        steps = self.rollout_steps
+        hold = self.interval // steps
+
+        for step in range(self.horizon // steps):
+            if step >= hold and step % hold == 0:
+                action = self.rollout_rng.randrange(action_count)
+            state.step(action, steps)
+            if state.hit or state.cleared:
+                break
+
+        value = state.score - root.score
+        if state.hit:
+            # Losing a ship costs more than any future gains.
+            value -= 1000 * root.alien_points
+        elif not state.cleared:
+            # Prefer ending up under the lowest alien, worth less than a hit.
+            layout = state.layout
+            target_x = state.get_lowest_alien_x() + layout.alien_width / 2
+            distance = abs(state.ship_x + layout.ship_width / 2 - target_x)
+            value -= root.alien_points * distance / layout.playfield_width
+
+        return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Let a planning bot play Alien Invasion."
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a window or sound, as fast as possible",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=None, help="stop after this many frames"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--settings", help="load settings from this profile file")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.004,
+        help="seconds to plan every move (default: 0.004)",
+    )
+    parser.add_argument(
+        "--rollouts",
+        type=int,
+        default=None,
+        help="futures to play out for every move instead of a time budget",
+    )
+    args = parser.parse_args()
+
+    ai_game = AlienInvasion(
+        headless=args.headless, seed=args.seed, settings_file=args.settings
+    )
+    player = PlanningPlayer(ai_game, budget=args.budget, max_rollouts=args.rollouts)
+    player.run_game(max_frames=args.frames)
+
+    if args.headless:
+        stats = ai_game.stats
+        print(f"Score: {stats.score}, level: {stats.level}, frames: {ai_game.frames}")
+    if player.decisions:
+        print(f"Futures per move: {player.rollouts / player.decisions:.0f}")
@@ -0,0 +1,118 @@
+"""A frame profiler for Alien Invasion."""
+from time import perf_counter_ns
+
+import numpy as np
+
+import assets
+
+# Phases of a frame, in the order they happen.
+phases = ("events", "ship", "bullets", "aliens", "screen", "other")
+EVENTS, SHIP, BULLETS, ALIENS, SCREEN, OTHER = range(len(phases))
+
+
+class FrameProfiler:
+    """Time every phase of the frames into a fixed-size ring buffer.
+
+    Call start_frame() when a frame begins, lap() at the end of every phase
+    and end_frame() when the frame is done. A frame is one drawn frame in a
+    window and one simulation step in headless mode.
+    """
+
+    def __init__(self, game, capacity):
+        """Initialize the profiler keeping the last capacity frames."""
+        self.settings = game.settings
+
+        # Nanoseconds spent in every phase of the last frames.
+        self.times = np.zeros((capacity, len(phases)), dtype=np.int64)
+        self.current = [0] * len(phases)
+        self.frames = 0
+        self.last = perf_counter_ns()
+
+        # The overlay is rendered again every overlay_interval frames.
+        self.text_color = (30, 30, 30)
+        self.font = None
+        self.overlay_interval = 30
+        self.overlay_images = []
+
+    def start_frame(self):
+        """Start timing a new frame."""
+        self.last = perf_counter_ns()
+
+    def lap(self, phase):
+        """Add the time since the last lap to the given phase."""
+        now = perf_counter_ns()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        """Store the times of the frame in the ring buffer."""
+        self.times[self.frames % len(self.times)] = self.current
+        self.current = [0] * len(phases)
+        self.frames += 1
+
+    def get_recent_times(self):
+        """Return the stored times in milliseconds, oldest frame first."""
+        capacity = len(self.times)
+        if self.frames <= capacity:
+            times = self.times[: self.frames]
+        else:
+            times = np.roll(self.times, -(self.frames % capacity), axis=0)
+
+        return times / 1e6
+
+    def get_percentiles(self):
+        """Return p50 and p99 milliseconds of every phase."""
+        times = self.get_recent_times()
+        if not len(times):
+            return np.zeros((2, len(phases)))
+
+        return np.percentile(times, (50, 99), axis=0)
+
+    def get_overlay(self, top):
+        """Return the (image, rect) pairs of p50/p99 of every phase below top.
+
+        The list is replaced, never changed, when the overlay is rendered again.
+        """
+        if self.frames % self.overlay_interval == 0 or not self.overlay_images:
+            self._prep_overlay(top)
+
+        return self.overlay_images
+
+    def _prep_overlay(self, top):
+        """Render the overlay as a table with a column per value."""
+        if self.font is None:
+            self.font = assets.get_font(18)
+
+        p50, p99 = self.get_percentiles()
+        rows = [("phase", "p50 ms", "p99 ms")] + [
+            (phase, f"{median:.3f}", f"{high:.3f}")
+            for phase, median, high in zip(phases, p50, p99)
+        ]
+
+        # Names are aligned left, times right.
+        self.overlay_images = []
+        for row in rows:
+            cells = [self._render(text) for text in row]
+            height = max(image.get_height() for image in cells)
+            name, median, high = cells
+            self.overlay_images += [
+                (name, name.get_rect(left=10, top=top)),
+                (median, median.get_rect(right=110, top=top)),
+                (high, high.get_rect(right=160, top=top)),
+            ]
+            top += height
+
+    def _render(self, text):
+        """Render a piece of text."""
+        return self.font.render(text, True, self.text_color, self.settings.bg_color)
+
+    def dump(self, file_name):
+        """Write the stored times in milliseconds to a CSV file."""
+        np.savetxt(
+            file_name,
+            self.get_recent_times(),
+            fmt="%.6f",
+            delimiter=",",
+            header=",".join(phases),
+            comments="",
+        )
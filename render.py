@@ -0,0 +1,181 @@
+"""Draw lists, the buffer that hands them to a render thread, and render scales."""
+import threading
+import weakref
+
+import pygame
+
+# Scaled copies of the images in draw lists, dropped with their images.
+_scaled_images = weakref.WeakKeyDictionary()
+
+
+class DrawList:
+    """Everything to draw in one frame, as layers drawn in order.
+
+    A layer either fills rects with a color or blits a sequence of
+    (surface, position) pairs. A draw list is not changed once it is made,
+    and the surfaces in it are never drawn on, so it can be drawn on
+    another thread while the game goes on. It also carries whether the
+    mouse cursor should be visible, since only the thread that shows the
+    frames may change the window.
+    """
+
+    __slots__ = ("layers", "camera", "mouse_visible")
+
+    def __init__(self, camera=(0, 0), mouse_visible=True):
+        """Start an empty draw list seen from the camera position."""
+        self.layers = []
+        self.camera = camera
+        self.mouse_visible = mouse_visible
+
+    def fill(self, color, rects):
+        """Add a layer filling the rects with the color."""
+        self.layers.append((True, color, rects))
+
+    def blits(self, blits, bounds=None):
+        """Add a layer of blits.
+
+        If bounds is given, it is the one rect the layer reports as drawn
+        instead of a rect per blit.
+        """
+        self.layers.append((False, blits, bounds))
+
+    def draw(self, surface):
+        """Draw all layers to the surface and return a list of drawn rects."""
+        rects = []
+
+        for is_fill, items, extra in self.layers:
+            if is_fill:
+                rects.extend(surface.fill(items, rect) for rect in extra)
+            elif extra is None:
+                rects.extend(surface.blits(items))
+            else:
+                surface.blits(items, False)
+                rects.append(extra)
+
+        return rects
+
+    def draw_scaled(self, surface, scale):
+        """Draw all layers to the surface, with every size and position scaled.
+
+        Images are scaled once and reused as long as they exist.
+        """
+        for is_fill, items, extra in self.layers:
+            if is_fill:
+                for rect in extra:
+                    surface.fill(items, _scale_rect(rect, scale))
+            else:
+                surface.blits(
+                    [
+                        (
+                            _scale_image(image, scale),
+                            (round(position[0] * scale), round(position[1] * scale)),
+                        )
+                        for image, position in items
+                    ],
+                    False,
+                )
+
+
+def _scale_rect(rect, scale):
+    """Return a rect with all its coordinates scaled, at least a pixel big."""
+    x, y, width, height = rect
+    return pygame.Rect(
+        round(x * scale),
+        round(y * scale),
+        max(round(width * scale), 1),
+        max(round(height * scale), 1),
+    )
+
+
+def _scale_image(image, scale):
+    """Return a shared copy of the image scaled by scale."""
+    scaled = _scaled_images.get(image)
+    if scaled is None or scaled[0] != scale:
+        width, height = image.get_size()
+        size = max(round(width * scale), 1), max(round(height * scale), 1)
+        scaled = _scaled_images[image] = (scale, pygame.transform.scale(image, size))
+
+    return scaled[1]
+
+
+class FrameBuffer:
+    """A double buffer of draw lists from a simulation thread to a render thread.
+
+    The simulation thread makes the next draw list while the render thread
+    draws the last one published. Publishing never waits: if the renderer
+    falls behind, it skips to the newest draw list, so drawing never slows
+    the simulation down.
+    """
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.ready = threading.Condition()
+        self.latest = None
+        self.closed = False
+
+    def publish(self, draw_list):
+        """Make the draw list the next one to draw."""
+        with self.ready:
+            self.latest = draw_list
+            self.ready.notify()
+
+    def take(self, timeout=None):
+        """Wait for a new draw list and return it.
+
+        Return None if there is none after timeout seconds, or once the
+        buffer is closed.
+        """
+        with self.ready:
+            self.ready.wait_for(lambda: self.latest or self.closed, timeout)
+            draw_list, self.latest = self.latest, None
+
+        return draw_list
+
+    def close(self):
+        """Tell the render thread that no more draw lists will come."""
+        with self.ready:
+            self.closed = True
+            self.ready.notify()
+
+
+class QualityController:
+    """Pick the scale of the internal resolution from recent drawing times.
+
+    The scale goes down a step when drawing takes longer than the budget on
+    average, and up a step when it takes less than half of it. After every
+    change the average is measured anew for settle_frames frames.
+    """
+
+    def __init__(self, settings):
+        """Start at the render scale of the settings."""
+        self.scale = settings.render_scale
+        self.adaptive = settings.adaptive_quality
+        self.min_scale = settings.min_render_scale
+        self.budget = settings.render_budget
+
+        self.scale_step = 0.1
+        self.settle_frames = 30
+        self.average = 0.0
+        self.frames = 0
+
+    def end_frame(self, render_time):
+        """Account for the seconds it took to draw a frame."""
+        if not self.adaptive:
+            return
+
+        self.frames += 1
+        self.average += (render_time - self.average) / min(self.frames, 10)
+        if self.frames < self.settle_frames:
+            return
+
+        if self.average > self.budget and self.scale > self.min_scale:
+            self._set_scale(max(self.scale - self.scale_step, self.min_scale))
+        elif self.average < self.budget / 2 and self.scale < 1.0:
+            self._set_scale(min(self.scale + self.scale_step, 1.0))
+
+    def _set_scale(self, scale):
+        """Change the scale and start measuring again."""
+        # Round away the float error of the steps, so scales repeat exactly.
+        self.scale = round(scale, 2)
+        self.average = 0.0
+        self.frames = 0
@@ -0,0 +1,58 @@
+"""Replay recorded Alien Invasion games."""
+import argparse
+import sys
+
+from alien_invasion import AlienInvasion
+from input_log import FIRE, MOVING_LEFT, MOVING_RIGHT, START, Recording
+
+
+def replay(file_name):
+    """Replay a recording headlessly as fast as possible.
+
+    Return the recording and the replayed game.
+    """
+    recording = Recording(file_name)
+    game = AlienInvasion(
+        headless=True,
+        seed=recording.seed,
+        history_file=None,
+        settings_profile=recording.profile,
+    )
+    game.stats.game_active = recording.active
+    game.settings.ship_hit_pause = (
+        recording.pause_steps / game.settings.steps_per_second
+    )
+    game.frames = 0
+
+    for flags, actions in recording.steps():
+        for action in actions:
+            if action == FIRE:
+                game._fire_bullet()
+            elif action == START:
+                game._start_game()
+
+        game.ship.moving_left = bool(flags & MOVING_LEFT)
+        game.ship.moving_right = bool(flags & MOVING_RIGHT)
+        game._update_game()
+        game.frames += 1
+
+    return recording, game
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded game and check that it ends the same."
+    )
+    parser.add_argument("file", help="recording to replay")
+    args = parser.parse_args()
+
+    recording, game = replay(args.file)
+    expected = (recording.step_count, recording.score, recording.level)
+    actual = (game.frames, game.stats.score, game.stats.level)
+
+    print(f"Recorded: {expected[0]} steps, score {expected[1]}, level {expected[2]}")
+    print(f"Replayed: {actual[0]} steps, score {actual[1]}, level {actual[2]}")
+
+    if actual != expected:
+        print("The replay does not match the recording.")
+        sys.exit(1)
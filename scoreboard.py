@@ -1,38 +1,55 @@
-import pygame.font
-from pygame.sprite import Group
+import assets
+from consts import ship_image_file
+from text_cache import TextCache
 
-from ship import Ship
+# Images of the scoreboard, in the order they must be prepared.
+images = ("score", "high_score", "level", "ships")
 
 
 class Scoreboard:
-    """A scoreboard with game info."""
+    """A scoreboard with game info.
+
+    Changes are collected with request_update() and the changed images are
+    prepared at most once per frame, right before they are drawn.
+    """
 
     def __init__(self, game):
-        self.screen = game.screen
         self.screen_rect = game.screen.get_rect()
         self.settings = game.settings
         self.stats = game.stats
 
         # Setup font settings.
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 24)
+        self.text_cache = TextCache(24, self.text_color, self.settings.bg_color)
 
+        # Names of the images to prepare before the next draw.
+        self.changed = set()
         self.prep_images()
 
     def prep_images(self):
-        # Prepare the initial score images.
-        self.prep_score()
-        self.prep_high_score()
-        self.prep_level()
-        self.prep_ships()
+        # Prepare the initial score images when they are first drawn.
+        self.request_update(*images)
+
+    def request_update(self, *names):
+        """Mark the named images to be prepared again before the next draw."""
+        self.changed.update(names)
+
+    def update(self):
+        """Prepare the images that changed since they were last drawn."""
+        if not self.changed:
+            return
+
+        for name in images:
+            if name in self.changed:
+                getattr(self, "prep_" + name)()
+
+        self.changed.clear()
 
     def prep_score(self):
         """Turn the score into a rendered image."""
         rounded_score = round(self.stats.score, -1)
         score_str = "Score: " + "{:,}".format(rounded_score)
-        self.score_image = self.font.render(
-            score_str, True, self.text_color, self.settings.bg_color
-        )
+        self.score_image = self.text_cache.render(score_str)
 
         # Render the message at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
@@ -43,12 +60,7 @@ class Scoreboard:
         """Turn the high score into a rendered image."""
         rounded_high_score = round(self.stats.high_score, -1)
         high_score_str = "High Score: " + "{:,}".format(rounded_high_score)
-        self.high_score_image = self.font.render(
-            high_score_str,
-            True,
-            self.text_color,
-            self.settings.bg_color,
-        )
+        self.high_score_image = self.text_cache.render(high_score_str)
 
         # Render the message at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
@@ -58,9 +70,7 @@ class Scoreboard:
     def prep_level(self):
         """Turn the game level into a rendered image."""
         level_str = "Level: " + str(self.stats.level)
-        self.level_image = self.font.render(
-            level_str, True, self.text_color, self.settings.bg_color
-        )
+        self.level_image = self.text_cache.render(level_str)
 
         # Render the message at the top right of the screen but below the score.
         self.level_rect = self.level_image.get_rect()
@@ -68,20 +78,21 @@ class Scoreboard:
         self.level_rect.top = self.score_rect.bottom + 10
 
     def prep_ships(self):
-        """Turn left ships into a rendered image."""
-        self.ships = Group()
-
-        for ship_number in range(self.stats.ships_left):
-            ship = Ship(self)
-            ship.image = pygame.transform.scale(ship.image, (50, 40))
-            ship.rect.x = 10 + (ship_number * ship.rect.width)
-            ship.rect.y = 10
-            self.ships.add(ship)
-
-    def show_score(self):
-        """Draw the scores to the screen."""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        # Draw ships.
-        self.ships.draw(self.screen)
+        """Place images of the ships left in a row."""
+        self.ship_image = assets.get_image(ship_image_file, (50, 40))
+        ship_width = assets.get_image(ship_image_file).get_width()
+
+        self.ships = [
+            (self.ship_image, (10 + ship_number * ship_width, 10))
+            for ship_number in range(self.stats.ships_left)
+        ]
+
+    def get_blits(self):
+        """Return the (image, position) pairs that draw the scores."""
+        self.update()
+
+        return [
+            (self.score_image, self.score_rect.copy()),
+            (self.high_score_image, self.high_score_rect.copy()),
+            (self.level_image, self.level_rect.copy()),
+        ] + self.ships
@@ -1,18 +1,68 @@
 """Settings for Alien Invasion."""
+import json
 
 
 class Settings:
-    """A class to store all settings for Alien Invasion."""
+    """A class to store all settings for Alien Invasion.
 
-    def __init__(self):
-        """Initialize the game's static settings."""
+    Static settings can be changed by a profile, a JSON file of setting
+    names and values.
+    """
+
+    def __init__(self, profile_file=None, profile=None):
+        """Initialize the game's static settings.
+
+        Apply the profile in profile_file and then the profile dictionary,
+        if given.
+        """
         # Screen settings.
         self.screen_width = 600
         self.screen_height = 500
         self.bg_color = (230, 230, 230)
+        # Play on the whole display, the screen size is then the display size.
+        self.fullscreen = False
+
+        # Internal resolution settings.
+        # Draw frames at this fraction of the screen size and scale them up
+        # to the screen in one step.
+        self.render_scale = 1.0
+        # Change the render scale with the time drawing takes, between
+        # min_render_scale and 1, to keep drawing within render_budget seconds.
+        self.adaptive_quality = False
+        self.min_render_scale = 0.5
+        self.render_budget = 0.008
+
+        # Playfield settings.
+        # The size of the field the game is played on, the size of the
+        # screen if None. A larger playfield scrolls with the ship.
+        self.playfield_width = None
+        self.playfield_height = None
+
+        # Redraw only the changed parts of the screen instead of a full flip.
+        self.dirty_rendering = False
+
+        # Draw on the main thread while a second thread runs the simulation.
+        self.render_thread = False
+
+        # Main loop settings.
+        # The game advances in steps of a fixed length, the speed factors
+        # below are given per step.
+        self.steps_per_second = 240
+        self.target_fps = 60
+        self.max_steps_per_frame = 16
+
+        # Sound settings.
+        # Most copies of one sound effect that play at once.
+        self.sound_channels = 4
+
+        # Profiler settings.
+        self.profile_frames = 4096
+        self.profile_file = "frame_profile.csv"
 
         # Ship settings.
         self.ship_limit = 3
+        # Seconds the game waits after the ship is hit.
+        self.ship_hit_pause = 0.5
 
         # Bullet settings.
         self.bullet_width = 3
@@ -22,6 +72,14 @@ class Settings:
 
         # Alien settings.
         self.fleet_drop_speed = 10
+        # How densely aliens fill a fleet: the gap between two aliens is
+        # 1 / fleet_density of an alien.
+        self.fleet_density = 1.0
+        # Fleets stacked on top of each other in every level.
+        self.fleet_waves = 1
+        # Largest fleet, in pixels of its bounding box, that is drawn from one
+        # pre-drawn layer instead of an image per alien. 0 turns layers off.
+        self.fleet_layer_pixels = 1024 * 1024
 
         # Speedup scale rate.
         self.speedup_scale = 1.1
@@ -29,8 +87,40 @@ class Settings:
         # How quickly the alien point values increase.
         self.score_scale = 1.5
 
+        # All settings changed by profiles, to store with recordings.
+        self.profile = {}
+        if profile_file:
+            self.load_profile(profile_file)
+        if profile:
+            self.apply_profile(profile, "the profile")
+
         self.initialize_dynamic_settings()
 
+    def load_profile(self, file_name):
+        """Change static settings to the values in a profile file."""
+        with open(file_name) as file:
+            profile = json.load(file)
+
+        self.apply_profile(profile, file_name)
+
+    def apply_profile(self, profile, source):
+        """Change static settings to the values in a profile dictionary.
+
+        The profile is read from source, which names it in errors.
+        """
+        unknown = sorted(
+            name for name in profile if not hasattr(self, name) or name == "profile"
+        )
+        if unknown:
+            raise ValueError(f"Unknown settings in {source}: {', '.join(unknown)}")
+
+        self.profile.update(profile)
+        for name, value in profile.items():
+            # JSON has no tuples, colors are given as lists.
+            if isinstance(value, list):
+                value = tuple(value)
+            setattr(self, name, value)
+
     def initialize_dynamic_settings(self):
         """Initialize settings that change throughout the game."""
         self.ship_speed_factor = 1.5
@@ -1,7 +1,9 @@
 """A ship for Alien Invasion."""
-import pygame
 from pygame.sprite import Sprite
 
+import assets
+from consts import ship_image_file
+
 
 class Ship(Sprite):
     """A class to work with a ship."""
@@ -9,19 +11,19 @@ class Ship(Sprite):
     def __init__(self, game):
         """Initialize the ship."""
         super().__init__()
-        self.screen = game.screen
         self.settings = game.settings
 
         # Load the ship image and set its rect.
-        self.image = pygame.image.load("images/ship.bmp")
+        self.image = assets.get_image(ship_image_file)
         self.rect = self.image.get_rect()
-        self.screen_rect = game.screen.get_rect()
+        self.playfield = game.playfield
 
         # Place the ship at the bottom center.
-        self.rect.midbottom = self.screen_rect.midbottom
+        self.rect.midbottom = self.playfield.midbottom
 
         # Store a decimal value for the ship's center.
         self.x = float(self.rect.x)
+        self.previous_x = self.x
 
         # Movement flag.
         self.moving_left = False
@@ -33,17 +35,25 @@ class Ship(Sprite):
         if self.moving_left and self.rect.left > 0:
             self.x -= self.settings.ship_speed_factor
 
-        if self.moving_right and self.rect.right < self.screen_rect.right:
+        if self.moving_right and self.rect.right < self.playfield.right:
             self.x += self.settings.ship_speed_factor
 
         # Update rect object from self.center.
         self.rect.x = self.x
 
-    def blitme(self):
-        """Draw the ship at its current location."""
-        self.screen.blit(self.image, self.rect)
+    def get_blit(self, alpha=1.0, camera=(0, 0)):
+        """Return the image and a new rect of where to draw the ship.
+
+        Place it alpha of the way from its previous location to the current
+        one, with the playfield position camera at the top left of the screen.
+        """
+        rect = self.rect.copy()
+        rect.x = self.x * alpha + self.previous_x * (1 - alpha) - camera[0]
+        rect.y -= camera[1]
+        return self.image, rect
 
     def center_ship(self):
-        """Center the ship on the screen."""
-        self.rect.midbottom = self.screen_rect.midbottom
+        """Center the ship on the playfield."""
+        self.rect.midbottom = self.playfield.midbottom
         self.x = float(self.rect.x)
+        self.previous_x = self.x
@@ -1,6 +1,70 @@
+"""Sound effects for Alien Invasion.
+
+Nothing happens on import. Sound stays off until enable() is called, and
+even then the mixer is only started and the sounds decoded when the first
+sound is played. Without an audio device, sound just stays off.
+"""
 import pygame
 
-pygame.mixer.init()
+# Sound effects and their files.
+BULLET = "bullet"
+ALIEN = "alien"
+_files = {BULLET: "sounds/laser.wav", ALIEN: "sounds/explosion.wav"}
+
+# Most copies of one sound that play at once, 0 while sound is off.
+_channels_per_sound = 0
+
+# Decoded sounds and the channels reserved for each, loaded on first use.
+_sounds = None
+_channels = None
+
+
+def enable(channels_per_sound):
+    """Turn sound on, playing at most channels_per_sound copies of a sound."""
+    global _channels_per_sound
+    _channels_per_sound = channels_per_sound
+
+
+def play(name):
+    """Play a sound effect on a free channel of its own.
+
+    The sound is dropped if all its channels are busy, or if sound is off.
+    """
+    if not _channels_per_sound:
+        return
+    if _sounds is None:
+        _load()
+
+    for channel in _channels.get(name, ()):
+        if not channel.get_busy():
+            channel.play(_sounds[name])
+            return
+
+
+def _load():
+    """Start the mixer, decode the sounds and reserve their channels."""
+    global _sounds, _channels, _channels_per_sound
+    _sounds, _channels = {}, {}
+
+    try:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        sounds = {name: pygame.mixer.Sound(file) for name, file in _files.items()}
+    except pygame.error:
+        # No audio device, play nothing.
+        _channels_per_sound = 0
+        return
+
+    # Keep the first channels away from anything else that plays sound.
+    channel_count = _channels_per_sound * len(sounds)
+    if pygame.mixer.get_num_channels() < channel_count:
+        pygame.mixer.set_num_channels(channel_count)
+    pygame.mixer.set_reserved(channel_count)
 
-bullet_sound = pygame.mixer.Sound("sounds/laser.wav")
-alien_sound = pygame.mixer.Sound("sounds/explosion.wav")
+    for number, name in enumerate(sounds):
+        first = number * _channels_per_sound
+        _channels[name] = [
+            pygame.mixer.Channel(first + offset)
+            for offset in range(_channels_per_sound)
+        ]
+    _sounds = sounds
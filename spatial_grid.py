@@ -0,0 +1,104 @@
+"""A uniform grid to find aliens near a rect quickly."""
+import numpy as np
+
+# Extra room around every query for rounding of the aliens' positions.
+_margin = 2
+
+
+class SpatialGrid:
+    """A uniform grid of cells with the indices of the items in each cell.
+
+    Items are put into cells by their top left corners when the grid is
+    built. The fleet only ever moves as a whole, so instead of moving items
+    between cells the grid keeps the distance the fleet has moved since and
+    shifts the queries back by it.
+    """
+
+    def __init__(self, cell_width, cell_height, item_width, item_height):
+        """Initialize an empty grid for items of the given size."""
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.item_width = item_width
+        self.item_height = item_height
+
+        self.build(np.empty(0), np.empty(0))
+
+    def build(self, x, y):
+        """Put the items with top left corners at x and y into the grid."""
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+
+        if not len(x):
+            self.first_column = self.first_row = 0
+            self.columns = self.rows = 0
+            return
+
+        column = np.floor_divide(x, self.cell_width).astype(np.int64)
+        row = np.floor_divide(y, self.cell_height).astype(np.int64)
+        self.first_column = int(column.min())
+        self.first_row = int(row.min())
+        self.columns = int(column.max()) - self.first_column + 1
+        self.rows = int(row.max()) - self.first_row + 1
+
+        # Sort the items by cell, each cell is a slice of the sorted indices.
+        self.cells = (row - self.first_row) * self.columns + (
+            column - self.first_column
+        )
+        self.order = np.argsort(self.cells, kind="stable")
+        counts = np.bincount(self.cells, minlength=self.rows * self.columns)
+        self.starts = np.concatenate(([0], np.cumsum(counts))).tolist()
+
+        # Number of items left in each cell, empty cells are skipped.
+        self.counts = counts.tolist()
+
+    def move(self, dx, dy):
+        """Move all items in the grid by dx and dy."""
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def remove(self, indices):
+        """Remove the items with the given indices from the grid."""
+        for cell in self.cells[indices].tolist():
+            self.counts[cell] -= 1
+
+    def query(self, rect):
+        """Return indices of the items that may collide with rect."""
+        left, top, width, height = rect
+        left -= self.offset_x
+        top -= self.offset_y
+
+        # Find the range of cells with items that may reach into the rect.
+        first_column = max(
+            int((left - self.item_width - _margin) // self.cell_width)
+            - self.first_column,
+            0,
+        )
+        last_column = min(
+            int((left + width + _margin) // self.cell_width) - self.first_column,
+            self.columns - 1,
+        )
+        first_row = max(
+            int((top - self.item_height - _margin) // self.cell_height)
+            - self.first_row,
+            0,
+        )
+        last_row = min(
+            int((top + height + _margin) // self.cell_height) - self.first_row,
+            self.rows - 1,
+        )
+
+        candidates = []
+        for row in range(first_row, last_row + 1):
+            row_start = row * self.columns
+            for cell in range(row_start + first_column, row_start + last_column + 1):
+                if self.counts[cell]:
+                    candidates.append(
+                        self.order[self.starts[cell] : self.starts[cell + 1]]
+                    )
+
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        elif len(candidates) == 1:
+            return candidates[0]
+        else:
+            return np.concatenate(candidates)
@@ -0,0 +1,41 @@
+"""Checks that scaled frames show the fleet as it is, not as it was."""
+import pygame
+
+from alien_invasion import AlienInvasion
+
+
+def draw_scaled(game, scale):
+    """Return the number of pixels off the background in a scaled frame."""
+    width, height = game.screen.get_size()
+    surface = pygame.Surface((round(width * scale), round(height * scale)))
+    surface.fill(game.settings.bg_color)
+    game._get_draw_list(1.0).draw_scaled(surface, scale)
+
+    bg_color = surface.map_rgb(game.settings.bg_color)
+    pixels = pygame.surfarray.pixels2d(surface)
+    return int((pixels != bg_color).sum())
+
+
+def kill_half_and_draw(settings_profile=None):
+    """Draw a fleet at half scale, kill half of it and draw it again.
+
+    Return the pixels off the background before and after the kill.
+    """
+    game = AlienInvasion(
+        headless=True, seed=0, history_file=None, settings_profile=settings_profile
+    )
+    game._start_game()
+    before = draw_scaled(game, 0.5)
+
+    aliens = game.aliens
+    aliens.kill(aliens.alive.nonzero()[0][: len(aliens) // 2])
+    return before, draw_scaled(game, 0.5)
+
+
+def test_scaled_layer_erases_killed_aliens():
+    layer_before, layer_after = kill_half_and_draw()
+    blits_before, blits_after = kill_half_and_draw({"fleet_layer_pixels": 0})
+
+    assert layer_after < layer_before
+    assert layer_after == blits_after
+    assert layer_before == blits_before
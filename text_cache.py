@@ -0,0 +1,71 @@
+"""A cache of rendered text for Alien Invasion."""
+import re
+from collections import OrderedDict
+
+import pygame
+
+import assets
+
+# Split text into digits and commas, and runs of other characters.
+_pieces = re.compile(r"[\d,]|[^\d,]+")
+
+
+class TextCache:
+    """Render text with a font and keep the recently rendered images.
+
+    Text is put together from separately rendered pieces: every digit and
+    comma, and every run of other characters. A new score then only costs
+    a few blits of cached pieces instead of a call to font.render().
+    The font is only loaded when the first text is rendered.
+    """
+
+    def __init__(self, font_size, text_color, bg_color, max_size=128):
+        """Initialize an empty cache keeping at most max_size images."""
+        self.font_size = font_size
+        self.font = None
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.max_size = max_size
+        self.images = OrderedDict()
+
+    def render(self, text):
+        """Return an image of the text, which callers must not draw on."""
+        image = self._get(text)
+        if image is None:
+            pieces = _pieces.findall(text)
+            if len(pieces) == 1:
+                if self.font is None:
+                    self.font = assets.get_font(self.font_size)
+                image = self.font.render(text, True, self.text_color, self.bg_color)
+            else:
+                image = self._join([self.render(piece) for piece in pieces])
+            self._put(text, image)
+
+        return image
+
+    def _join(self, images):
+        """Return an image with the given images side by side."""
+        width = sum(image.get_width() for image in images)
+        height = max(image.get_height() for image in images)
+        joined = pygame.Surface((width, height))
+        joined.fill(self.bg_color)
+
+        x = 0
+        for image in images:
+            joined.blit(image, (x, 0))
+            x += image.get_width()
+
+        return joined
+
+    def _get(self, text):
+        """Return the cached image of the text, or None."""
+        image = self.images.get(text)
+        if image is not None:
+            self.images.move_to_end(text)
+        return image
+
+    def _put(self, text, image):
+        """Cache the image, dropping the least recently used one if full."""
+        self.images[text] = image
+        if len(self.images) > self.max_size:
+            self.images.popitem(last=False)